@@ -0,0 +1,4 @@
+"""
+Ядро конвертации без зависимостей от Qt.
+Используется окнами из gui и консольной утилитой (python -m convertor).
+"""
@@ -0,0 +1,78 @@
+import os
+import shutil
+import threading
+
+import pypandoc
+
+from converter.cache import DiskCache, file_hash, get_cache_config
+from converter.settings import DATA_DIR, get_setting
+
+DEFAULT_AST_CACHE_SIZE_MB = 256
+AST_FILE = "document.json"
+# Читатели, которые дороже, чем запись AST на диск и чтение его обратно
+AST_FORMATS = ("docx", "odt")
+
+_ast_cache = None
+_ast_cache_lock = threading.Lock()
+
+
+class AstCache(DiskCache):
+    """
+    JSON AST pandoc по ключу «хэш содержимого файла + формат + версия pandoc».
+    Запись — каталог с document.json и извлечёнными картинками media/, так что
+    писатели любого формата работают без повторного разбора исходника.
+    """
+
+    def key_for(self, file_path, input_format):
+        version = pypandoc.get_pandoc_version().replace(".", "_")
+        return f"{file_hash(file_path)}-{input_format}-{version}"
+
+
+def get_ast_cache_size_mb():
+    try:
+        return max(0, int(get_setting("ast_cache_size_mb", DEFAULT_AST_CACHE_SIZE_MB)))
+    except (TypeError, ValueError):
+        return DEFAULT_AST_CACHE_SIZE_MB
+
+
+def get_ast_cache():
+    """
+    Кэш AST или None, если кэш выключен (--no-cache).
+    """
+    global _ast_cache
+    enabled, _ = get_cache_config()
+    if not enabled:
+        return None
+    with _ast_cache_lock:
+        if _ast_cache is None:
+            _ast_cache = AstCache(os.path.join(DATA_DIR, "ast"), get_ast_cache_size_mb() * 1024 * 1024)
+        return _ast_cache
+
+
+def get_document_ast(file_path, input_format, work_dir):
+    """
+    Кладёт AST документа с картинками в пустой каталог work_dir и возвращает
+    путь к document.json или None, если кэш выключен. Писатель читает копию,
+    а не запись кэша: её может вытеснить параллельная конвертация, пока
+    pandoc её читает. Картинки указаны относительно work_dir — его нужно
+    передать писателю в --resource-path.
+    """
+    cache = get_ast_cache()
+    if cache is None:
+        return None
+    ast_path = os.path.join(work_dir, AST_FILE)
+    key = cache.key_for(file_path, input_format)
+    entry = cache.get(key)
+    if entry is not None:
+        try:
+            shutil.copytree(entry, work_dir, dirs_exist_ok=True)
+            return ast_path
+        except (OSError, shutil.Error):
+            # Запись вытеснили прямо во время копирования — разбираем документ заново
+            pass
+    pypandoc.convert_file(
+        os.path.abspath(file_path), "json", format=input_format,
+        outputfile=ast_path, extra_args=["--extract-media=."], cworkdir=work_dir
+    )
+    cache.put(key, work_dir)
+    return ast_path
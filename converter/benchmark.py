@@ -0,0 +1,132 @@
+import os
+import time
+import shutil
+import tempfile
+
+import docx
+
+from converter.document import convert_to_pdf, get_pandoc_format
+from converter.pdf_engines import get_available_engines, set_pdf_engine
+
+# Небольшой встроенный набор документов: кириллица, списки, таблица, выделение
+SAMPLE_MARKDOWN = """# Отчёт о конвертации
+
+Документ для замера скорости движков PDF. В нём есть **полужирный** и
+*курсивный* текст, [ссылка](https://example.com) и `код`.
+
+## Список
+
+- первый пункт
+- второй пункт
+- третий пункт
+
+## Таблица
+
+| Формат | Файлов | Размер |
+|--------|-------:|-------:|
+| docx   |     12 | 1.2 MB |
+| odt    |      4 | 0.3 MB |
+| html   |     30 | 2.8 MB |
+"""
+
+SAMPLE_HTML = """<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="utf-8"><title>Отчёт о конвертации</title></head>
+<body>
+<h1>Отчёт о конвертации</h1>
+<p>Документ для замера скорости движков PDF: <b>полужирный</b>, <i>курсив</i>,
+<a href="https://example.com">ссылка</a> и <code>код</code>.</p>
+<ul><li>первый пункт</li><li>второй пункт</li><li>третий пункт</li></ul>
+<table>
+<tr><th>Формат</th><th>Файлов</th><th>Размер</th></tr>
+<tr><td>docx</td><td>12</td><td>1.2 MB</td></tr>
+<tr><td>odt</td><td>4</td><td>0.3 MB</td></tr>
+<tr><td>html</td><td>30</td><td>2.8 MB</td></tr>
+</table>
+</body>
+</html>
+"""
+
+
+def write_sample_corpus(folder):
+    paths = []
+    for name, text in (("sample.md", SAMPLE_MARKDOWN), ("sample.html", SAMPLE_HTML)):
+        path = os.path.join(folder, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        paths.append(path)
+
+    document = docx.Document()
+    document.add_heading("Отчёт о конвертации", level=1)
+    document.add_paragraph("Документ для замера скорости движков PDF.")
+    for item in ("первый пункт", "второй пункт", "третий пункт"):
+        document.add_paragraph(item, style="List Bullet")
+    table = document.add_table(rows=1, cols=3)
+    for cell, text in zip(table.rows[0].cells, ("Формат", "Файлов", "Размер")):
+        cell.text = text
+    path = os.path.join(folder, "sample.docx")
+    document.save(path)
+    paths.append(path)
+    return paths
+
+
+def time_engine(engine, input_format, paths, output_dir):
+    """
+    Время конвертации всех paths движком engine. Первый файл конвертируется
+    заранее и не учитывается: так в замер не попадает разовая подготовка
+    (сборка формата xelatex, кэш шрифтов).
+    """
+    def convert(path, index):
+        output_path = os.path.join(output_dir, f"{engine}-{input_format}-{index}.pdf")
+        convert_to_pdf(path, input_format, output_path, engine)
+
+    convert(paths[0], "warmup")
+    start = time.perf_counter()
+    for index, path in enumerate(paths):
+        convert(path, index)
+    return time.perf_counter() - start
+
+
+def benchmark_pdf_engines(files=None, record=True, report=None):
+    """
+    Замеряет каждый установленный движок PDF на файлах (по умолчанию — на
+    встроенном наборе) отдельно для каждого входного формата. Самый быстрый
+    работающий движок записывается в настройку pdf_engines для своей пары.
+    Возвращает {формат: [(движок, секунды или None, ошибка или None), ...]}.
+    report(формат, движок, секунды, ошибка) вызывается после каждого замера.
+    """
+    engines = get_available_engines()
+    if not engines:
+        raise Exception("Не найдено ни одного движка PDF")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        if not files:
+            files = write_sample_corpus(work_dir)
+
+        by_format = {}
+        for path in files:
+            input_format = get_pandoc_format(os.path.splitext(path)[1].lower())
+            if input_format:
+                by_format.setdefault(input_format, []).append(path)
+
+        results = {}
+        for input_format, paths in by_format.items():
+            results[input_format] = []
+            for engine in engines:
+                try:
+                    seconds, error = time_engine(engine, input_format, paths, work_dir), None
+                except Exception as e:
+                    # Из длинного вывода движка хватит первой строки
+                    message = str(e).strip() or type(e).__name__
+                    seconds, error = None, message.splitlines()[0]
+                results[input_format].append((engine, seconds, error))
+                if report:
+                    report(input_format, engine, seconds, error)
+
+            working = [(seconds, engine) for engine, seconds, error in results[input_format] if error is None]
+            if record and working:
+                set_pdf_engine(input_format, min(working)[1])
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
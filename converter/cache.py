@@ -0,0 +1,296 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import uuid
+
+from converter.settings import DATA_DIR, get_setting
+
+# Меняется, когда меняется сама логика конвертации и старые результаты устаревают
+CACHE_VERSION = 1
+DEFAULT_CACHE_SIZE_MB = 1024
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def file_hash(path):
+    """
+    SHA-256 содержимого файла. Результат запоминается по (путь, размер, mtime),
+    чтобы повторные задачи в одном сеансе не перечитывали большие файлы.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        if memo_key in _hash_memo:
+            return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    result = digest.hexdigest()
+
+    with _hash_lock:
+        _hash_memo[memo_key] = result
+    return result
+
+
+def get_entry_size(path):
+    if os.path.isdir(path):
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        return total
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def remove_entry(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class DiskCache:
+    """
+    Кэш на диске с вытеснением давно не используемых записей (LRU).
+    Запись — файл или каталог root/<2 символа ключа>/<ключ>; время последнего
+    использования хранится в mtime записи. Когда суммарный размер превышает
+    max_bytes, удаляются самые старые записи.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, source_path):
+        """
+        Копирует файл или каталог в кэш. Запись появляется атомарно.
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        if os.path.isdir(source_path):
+            shutil.copytree(source_path, temp_path)
+        else:
+            shutil.copyfile(source_path, temp_path)
+        self.commit(temp_path, path)
+        return path
+
+    def put_files(self, key, paths):
+        """
+        Сохраняет набор файлов одним каталогом-записью (например, страницы PDF).
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(temp_path)
+        for source_path in paths:
+            shutil.copyfile(source_path, os.path.join(temp_path, os.path.basename(source_path)))
+        self.commit(temp_path, path)
+        return path
+
+    def put_bytes(self, key, data):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        self.commit(temp_path, path)
+        return path
+
+    def commit(self, temp_path, path):
+        size = get_entry_size(temp_path)
+        old_size = get_entry_size(path) if os.path.exists(path) else 0
+        try:
+            if os.path.isdir(temp_path) and os.path.exists(path):
+                remove_entry(path)
+            os.replace(temp_path, path)
+        except OSError:
+            # Ту же запись одновременно сохранил другой поток или процесс
+            remove_entry(temp_path)
+            return
+        with self.lock:
+            if self.total_bytes is not None:
+                self.total_bytes += size - old_size
+        # Только что сохранённая запись нужна вызывающему, даже если она одна больше лимита
+        self.evict(keep=path)
+
+    def scan(self):
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for bucket in os.scandir(self.root):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                entries.append((mtime, get_entry_size(entry.path), entry.path))
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Удаляет самые старые записи, пока кэш не уложится в max_bytes.
+        Запись keep не удаляется никогда.
+        """
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for _, size, _ in self.scan())
+            if self.total_bytes <= self.max_bytes:
+                return
+            entries = sorted(self.scan())
+            self.total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                remove_entry(path)
+                self.total_bytes -= size
+
+    def clear(self):
+        with self.lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.total_bytes = 0
+
+
+class ConversionCache(DiskCache):
+    """
+    Результаты конвертаций по ключу «хэш содержимого входа + параметры».
+    """
+
+    def key_for(self, file_path, params):
+        payload = json.dumps(
+            {"v": CACHE_VERSION, "input": file_hash(file_path), "params": params},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def restore(self, key, output_path):
+        """
+        Копирует результат из кэша в output_path. Если запись вытеснили во
+        время копирования, недописанный результат удаляется и возвращается
+        False — тогда конвертация просто выполняется заново.
+        """
+        cached_path = self.get(key)
+        if cached_path is None:
+            return False
+        copied = []
+        try:
+            if os.path.isdir(cached_path):
+                os.makedirs(output_path, exist_ok=True)
+                for name in os.listdir(cached_path):
+                    source, target = os.path.join(cached_path, name), os.path.join(output_path, name)
+                    copied.append(target)
+                    if os.path.isdir(source):
+                        shutil.copytree(source, target, dirs_exist_ok=True)
+                    else:
+                        shutil.copyfile(source, target)
+            else:
+                copied.append(output_path)
+                shutil.copyfile(cached_path, output_path)
+        except (OSError, shutil.Error):
+            # В каталоге результата могли быть и чужие файлы — удаляем только свои
+            for path in copied:
+                remove_entry(path)
+            return False
+        return True
+
+    def store(self, key, output_path, files=None):
+        if files is not None:
+            self.put_files(key, files)
+        elif os.path.exists(output_path):
+            self.put(key, output_path)
+
+
+_cache = None
+_cache_enabled = True
+_cache_size_mb = None
+_cache_lock = threading.Lock()
+
+
+def get_cache_size_mb():
+    value = os.environ.get("CONVERTOR_CACHE_SIZE_MB") or get_setting("cache_size_mb", DEFAULT_CACHE_SIZE_MB)
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return DEFAULT_CACHE_SIZE_MB
+
+
+def configure_cache(enabled=True, size_mb=None):
+    global _cache, _cache_enabled, _cache_size_mb
+    with _cache_lock:
+        _cache_enabled = enabled
+        _cache_size_mb = size_mb
+        _cache = None
+
+
+def get_cache_config():
+    """
+    Текущие настройки кэша — чтобы передать их в дочерние процессы пула.
+    """
+    return _cache_enabled, _cache_size_mb
+
+
+def get_cache():
+    """
+    Общий кэш конвертаций или None, если кэш выключен.
+    """
+    global _cache
+    with _cache_lock:
+        if not _cache_enabled:
+            return None
+        if _cache is None:
+            size_mb = _cache_size_mb if _cache_size_mb is not None else get_cache_size_mb()
+            _cache = ConversionCache(os.path.join(DATA_DIR, "conversions"), size_mb * 1024 * 1024)
+        return _cache
+
+
+def run_cached(file_path, params, output_path, convert):
+    """
+    Если такой же вход уже конвертировался с теми же параметрами, копирует
+    готовый результат из кэша; иначе вызывает convert() и сохраняет результат.
+    Если результат — каталог, convert() возвращает список записанных файлов,
+    чтобы в кэш не попали файлы от прошлых запусков.
+    """
+    cache = get_cache()
+    if cache is None:
+        convert()
+        return output_path
+
+    key = cache.key_for(file_path, params)
+    if cache.restore(key, output_path):
+        return output_path
+    written_files = convert()
+    cache.store(key, output_path, written_files)
+    return output_path
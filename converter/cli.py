@@ -0,0 +1,189 @@
+import argparse
+import glob
+import importlib
+import os
+import sys
+
+# Категория -> (модуль, функция конвертации)
+CATEGORIES = {
+    "image": ("converter.image", "convert_image"),
+    "audio": ("converter.media", "convert_media"),
+    "video": ("converter.media", "convert_media"),
+    "document": ("converter.document", "convert_document"),
+    "pdf-image": ("converter.pdf_to_image", "convert_pdf_to_images"),
+    "pdf": ("converter.pdf", "convert_pdf"),
+    "image-pdf": ("converter.image_to_pdf", "convert_image_to_pdf"),
+}
+
+
+def expand_inputs(patterns):
+    """
+    Раскрывает шаблоны (*.png, **/*.pdf) и убирает повторы, сохраняя порядок.
+    Возвращает (файлы, ненайденные пути): явно указанный файл, которого нет,
+    считается ошибкой, а шаблон без совпадений — нет.
+    """
+    files = []
+    missing = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not glob.has_magic(pattern) and not os.path.isfile(pattern):
+            print(f"[✗] Файл не найден: {pattern}", file=sys.stderr)
+            missing.append(pattern)
+        for path in matches:
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files, missing
+
+
+def build_job_kwargs(args):
+    if args.category == "document":
+        return {"to_format": args.to, "grayscale": args.grayscale}
+    if args.category == "pdf-image":
+        dpi = None if args.dpi in (None, "auto") else int(args.dpi)
+        kwargs = {"image_format": args.to or "png", "dpi": dpi}
+        if args.progress:
+            kwargs["progress_callback"] = print_page_progress
+        return kwargs
+    if args.category == "image-pdf":
+        target_dpi = None if args.dpi in (None, "auto") else int(args.dpi)
+        return {"page_format": args.page_format, "target_dpi": target_dpi}
+    return {"to_format": args.to}
+
+
+def print_media_progress(file_path, info):
+    from converter.media import format_progress
+    print(f"    {file_path}: {format_progress(info)}", file=sys.stderr)
+
+
+def print_page_progress(info):
+    print(f"    страница {info['page']} из {info['pages']} ({info['percent']}%)", file=sys.stderr)
+
+
+def run_jobs(args, files):
+    """
+    Запускает конвертацию и отдаёт (путь, результат, ошибка) по каждому файлу.
+    """
+    if args.category == "image":
+        from converter.image import convert_images_parallel
+        yield from convert_images_parallel(((path, args.to) for path in files), args.workers)
+        return
+    if args.category in ("audio", "video"):
+        from converter.media import FfmpegScheduler
+        if args.threads:
+            scheduler = FfmpegScheduler(args.workers, args.threads)
+        elif args.category == "audio":
+            scheduler = FfmpegScheduler.for_audio(args.workers)
+        else:
+            scheduler = FfmpegScheduler.for_video(args.workers)
+        progress_callback = print_media_progress if args.progress else None
+        yield from scheduler.run(((path, args.to) for path in files), progress_callback)
+        return
+
+    module_name, func_name = CATEGORIES[args.category]
+    convert = getattr(importlib.import_module(module_name), func_name)
+    kwargs = build_job_kwargs(args)
+    for file_path in files:
+        try:
+            yield file_path, convert(file_path, **kwargs), None
+        except Exception as e:
+            yield file_path, None, str(e)
+
+
+def print_benchmark_result(input_format, engine, seconds, error):
+    if error is None:
+        print(f"    {input_format} → pdf, {engine}: {seconds:.2f} с")
+    else:
+        print(f"    {input_format} → pdf, {engine}: ошибка — {error}", file=sys.stderr)
+
+
+def run_benchmark(args):
+    """
+    Замер движков PDF на файлах из inputs или на встроенном наборе документов.
+    """
+    from converter.benchmark import benchmark_pdf_engines
+    files, missing = expand_inputs(args.inputs) if args.inputs else (None, [])
+    if missing and not files:
+        # Иначе замер молча пошёл бы на встроенном наборе
+        print("Нет файлов для замера", file=sys.stderr)
+        return 1
+    try:
+        results = benchmark_pdf_engines(files, record=not args.no_record, report=print_benchmark_result)
+    except Exception as e:
+        print(f"[✗] {e}", file=sys.stderr)
+        return 1
+
+    for input_format, timings in results.items():
+        working = [(seconds, engine) for engine, seconds, error in timings if error is None]
+        if working:
+            print(f"[✓] {input_format} → pdf: быстрее всех {min(working)[1]}")
+        else:
+            print(f"[✗] {input_format} → pdf: ни один движок не справился", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m convertor",
+        description="Пакетная конвертация файлов без графического интерфейса"
+    )
+    parser.add_argument("category", choices=list(CATEGORIES) + ["benchmark"],
+                        help="категория конвертации; benchmark — замер движков PDF для документов")
+    parser.add_argument("inputs", nargs="*", help="файлы или шаблоны (например, 'photos/*.png'); "
+                                                  "для benchmark по умолчанию — встроенный набор")
+    parser.add_argument("-t", "--to", help="целевой формат (jpeg, mp3, pdf, docx ...)")
+    parser.add_argument("--dpi", default="auto", help="DPI для pdf-image; для image-pdf — до какого DPI уменьшать "
+                             "изображение на странице (по умолчанию auto)")
+    parser.add_argument("--page-format", default="A4", choices=["A4", "A3", "A5"],
+                        help="формат страницы для image-pdf")
+    parser.add_argument("--grayscale", action="store_true",
+                        help="изображения в сером цвете (document → pdf)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="число параллельных процессов (по умолчанию — число ядер)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="потоков на один процесс ffmpeg (audio/video)")
+    parser.add_argument("--progress", action="store_true",
+                        help="показывать ход конвертации (audio/video — процент, fps, скорость и ETA; "
+                             "pdf-image — готовые страницы)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="не использовать кэш готовых конвертаций")
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="предельный размер кэша конвертаций, МБ")
+    parser.add_argument("--no-record", action="store_true",
+                        help="benchmark: не сохранять самый быстрый движок в настройках")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.category == "benchmark":
+        return run_benchmark(args)
+    if not args.inputs:
+        parser.error("не указаны файлы для конвертации")
+    if args.category not in ("pdf-image", "image-pdf") and not args.to:
+        parser.error("для этой категории нужен целевой формат (--to)")
+
+    if args.no_cache or args.cache_size is not None:
+        from converter.cache import configure_cache
+        configure_cache(enabled=not args.no_cache, size_mb=args.cache_size)
+
+    files, missing = expand_inputs(args.inputs)
+    if not files:
+        print("Нет файлов для конвертации", file=sys.stderr)
+        return 1
+
+    # Ненайденные файлы уже отмечены [✗] и считаются неудачными
+    failed = len(missing)
+    total = len(files) + len(missing)
+    for file_path, output_path, error in run_jobs(args, files):
+        if error is None:
+            print(f"[✓] {file_path} → {output_path}")
+        else:
+            failed += 1
+            print(f"[✗] {file_path}: {error}", file=sys.stderr)
+
+    print(f"Готово: {total - failed} из {total}")
+    return 1 if failed else 0
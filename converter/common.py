@@ -0,0 +1,31 @@
+import os
+
+
+def make_output_path(file_path, extension, suffix="_converted"):
+    return os.path.splitext(file_path)[0] + f"{suffix}.{extension}"
+
+
+def parse_conversion(selected_conversion):
+    """
+    Разбирает строку вида "png → jpeg" и возвращает пару форматов.
+    """
+    if '→' not in selected_conversion:
+        raise Exception("Неверный формат выбора")
+    from_format, to_format = [s.strip() for s in selected_conversion.split('→')]
+    return from_format, to_format
+
+
+def get_file_size(path):
+    if os.path.exists(path):
+        return os.path.getsize(path)
+    return None
+
+
+def get_folder_size(folder):
+    total = 0
+    for dirpath, _, filenames in os.walk(folder):
+        for f in filenames:
+            fp = os.path.join(dirpath, f)
+            if os.path.isfile(fp):
+                total += os.path.getsize(fp)
+    return total
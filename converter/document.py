@@ -0,0 +1,218 @@
+import io
+import os
+import re
+import shutil
+import zipfile
+import tempfile
+
+from converter.cache import file_hash, run_cached
+from converter.common import make_output_path
+from converter.text_pdf import can_convert_text_to_pdf, convert_text_to_pdf
+from converter.latex_format import is_format_enabled, convert_to_pdf_with_format
+from converter.ast_cache import AST_FORMATS, get_document_ast
+from converter.pdf_engines import PDF_VARIABLES, get_pdf_engine, get_engine_args
+from converter.gray_images import GRAY_IMAGE_EXTENSIONS, make_gray_images, make_gray_blobs
+from converter.pandoc import run_pandoc
+
+DOCUMENT_EXTENSIONS = [".txt", ".docx", ".doc", ".odt", ".md", ".html"]
+
+DOCUMENT_CONVERSIONS = {
+    '.txt': ['markdown → pdf', 'markdown → docx', 'markdown → odt'],
+    '.docx': ['docx → pdf', 'docx → markdown', 'docx → odt'],
+    '.odt': ['odt → pdf', 'odt → markdown', 'odt → docx'],
+    '.md': ['markdown → pdf', 'markdown → html'],
+    '.html': ['html → pdf', 'html → docx']
+}
+
+MARKDOWN_IMAGE_PATTERN = r'!\[[^\]]*\]\(([^\)]+)\)'
+HTML_IMAGE_PATTERN = r'<img[^>]+src=["\']([^"\']+)["\']'
+
+PANDOC_FORMATS = {
+    '.txt': 'markdown',
+    '.md': 'markdown',
+    '.docx': 'docx',
+    '.odt': 'odt',
+    '.html': 'html'
+}
+
+
+def get_document_conversions(ext):
+    return DOCUMENT_CONVERSIONS.get(ext, [])
+
+
+def get_pandoc_format(ext):
+    return PANDOC_FORMATS.get(ext, None)
+
+
+def convert_to_pdf(input_path, input_format, output_path, engine, extra_args=()):
+    """
+    PDF через pandoc выбранным движком (xelatex, weasyprint, wkhtmltopdf ...).
+    input_path — путь к файлу или документ в памяти (bytes).
+    """
+    extra_args = list(extra_args)
+    # Пакет документов: преамбула pandoc берётся из предкомпилированного
+    # формата xelatex, а не загружается заново для каждого файла
+    if engine == 'xelatex' and is_format_enabled():
+        if convert_to_pdf_with_format(input_path, input_format, output_path, extra_args + PDF_VARIABLES):
+            return
+
+    output = run_pandoc(
+        input_path, 'pdf', input_format,
+        outputfile=output_path, extra_args=extra_args + get_engine_args(engine)
+    )
+    if output is not None and output.strip() != "":
+        raise Exception("Ошибка при конвертации (output не пустой)")
+
+
+def convert_document(file_path, to_format, grayscale=False):
+    ext = os.path.splitext(file_path)[1].lower()
+    from_format = get_pandoc_format(ext)
+
+    if not from_format:
+        raise Exception(f"Формат {ext} не поддерживается как входной.")
+
+    ext_map = {'plain': 'txt', 'markdown': 'txt'}
+    file_extension = ext_map.get(to_format, to_format)
+    output_path = make_output_path(file_path, file_extension)
+    # Простой текст и markdown без разметки набираются сразу в fpdf2:
+    # запуск xelatex стоит секунды на каждый файл
+    use_text_engine = to_format == 'pdf' and from_format == 'markdown' and can_convert_text_to_pdf(file_path)
+    # Остальное — движком, выбранным для пары «формат → pdf»
+    engine = get_pdf_engine(from_format) if to_format == 'pdf' else None
+
+    def convert():
+        if use_text_engine:
+            convert_text_to_pdf(file_path, output_path)
+            return
+
+        extra_args = []
+        input_path = file_path
+        input_format = from_format
+        temp_input = None
+        ast_dir = None
+
+        if to_format == 'pdf' and grayscale:
+            if input_format == 'markdown':
+                temp_input = input_path = convert_images_to_gray(file_path)
+                input_format = 'markdown'
+                extra_args.append(f'--resource-path={os.path.dirname(os.path.abspath(file_path))}')
+            elif input_format == 'docx':
+                input_path = convert_images_to_gray_docx(file_path)
+
+        try:
+            # docx/odt разбираются один раз: писатели всех форматов читают готовый AST
+            if input_format in AST_FORMATS and isinstance(input_path, str):
+                ast_dir = tempfile.mkdtemp()
+                ast_path = get_document_ast(input_path, input_format, ast_dir)
+                if ast_path is not None:
+                    extra_args.append(f'--resource-path={ast_dir}')
+                    input_path, input_format = ast_path, 'json'
+
+            if to_format == 'pdf':
+                convert_to_pdf(input_path, input_format, output_path, engine, extra_args)
+                return
+            output = run_pandoc(
+                input_path, to_format, input_format,
+                outputfile=output_path, extra_args=extra_args
+            )
+        finally:
+            # Временный markdown и черно-белые картинки лежат в своём каталоге
+            if temp_input is not None:
+                shutil.rmtree(os.path.dirname(temp_input), ignore_errors=True)
+            # Копия AST нужна только на время этой конвертации
+            if ast_dir is not None:
+                shutil.rmtree(ast_dir, ignore_errors=True)
+
+        if output is not None and output.strip() != "":
+            raise Exception("Ошибка при конвертации (output не пустой)")
+
+    params = {
+        "converter": "document",
+        "to": to_format,
+        "grayscale": grayscale and to_format == 'pdf',
+        "images": [file_hash(path) for path in get_referenced_images(file_path)]
+    }
+    if to_format == 'pdf':
+        params["engine"] = "fpdf" if use_text_engine else engine
+        if grayscale and from_format == 'docx':
+            # docx в сером цвете больше не сводится к тексту — старые результаты не годятся
+            params["gray_docx"] = "media"
+    return run_cached(file_path, params, output_path, convert)
+
+
+def get_referenced_images(file_path):
+    """
+    Локальные изображения, на которые ссылается markdown или html. Их содержимое
+    входит в ключ кэша: документ мог не измениться, а картинка рядом — измениться.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in ('.md', '.txt', '.html'):
+        return []
+    pattern = HTML_IMAGE_PATTERN if ext == '.html' else MARKDOWN_IMAGE_PATTERN
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
+    dir_path = os.path.dirname(file_path)
+    paths = []
+    for match in re.finditer(pattern, content):
+        full_path = os.path.join(dir_path, match.group(1))
+        if os.path.isfile(full_path):
+            paths.append(full_path)
+    return paths
+
+
+def convert_images_to_gray_docx(docx_path):
+    """
+    DOCX с черно-белыми картинками, собранный в памяти: переписываются только
+    записи word/media/*, текст, стили и разметка остаются как были. Картинки
+    обрабатываются параллельно, результат (bytes) pandoc получает через stdin.
+    """
+    with zipfile.ZipFile(docx_path) as source:
+        infos = source.infolist()
+        parts = {info.filename: source.read(info) for info in infos}
+
+    media = {name: data for name, data in parts.items() if name.startswith('word/media/')}
+    parts.update(make_gray_blobs(media))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as target:
+        for info in infos:
+            target.writestr(info, parts[info.filename])
+    return buffer.getvalue()
+
+
+def convert_images_to_gray(filepath):
+    """
+    Копия markdown во временном каталоге, где локальные картинки заменены
+    черно-белыми. Картинки обрабатываются параллельно и берутся из кэша по
+    хэшу содержимого; остальные относительные ссылки ищутся через
+    --resource-path в каталоге исходного файла.
+    """
+    dir_path = os.path.dirname(filepath)
+    temp_dir = tempfile.mkdtemp()
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    images = []
+    for match in re.finditer(MARKDOWN_IMAGE_PATTERN, content):
+        full_path = os.path.join(dir_path, match.group(1))
+        if os.path.isfile(full_path) and os.path.splitext(full_path)[1].lower() in GRAY_IMAGE_EXTENSIONS:
+            images.append(full_path)
+    gray_paths = make_gray_images(images, temp_dir)
+
+    def replace_image(match):
+        gray_path = gray_paths.get(os.path.join(dir_path, match.group(1)))
+        if gray_path is None:
+            return match.group(0)
+        return match.group(0).replace(match.group(1), gray_path.replace(os.sep, '/'))
+
+    content = re.sub(MARKDOWN_IMAGE_PATTERN, replace_image, content)
+
+    gray_md_path = os.path.join(temp_dir, 'converted.md')
+    with open(gray_md_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    return gray_md_path
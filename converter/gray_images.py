@@ -0,0 +1,134 @@
+import io
+import os
+import uuid
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from converter.cache import DiskCache, file_hash, get_cache_config
+from converter.image import get_default_workers
+from converter.settings import DATA_DIR, get_setting
+
+DEFAULT_GRAY_CACHE_SIZE_MB = 256
+GRAY_IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+
+_gray_cache = None
+_gray_cache_lock = threading.Lock()
+
+
+class GrayImageCache(DiskCache):
+    """
+    Черно-белые копии картинок по ключу «хэш содержимого + расширение».
+    Одни и те же картинки из общих папок конвертируются один раз.
+    """
+
+    def key_for(self, file_path):
+        return file_hash(file_path) + os.path.splitext(file_path)[1].lower()
+
+
+def get_gray_cache_size_mb():
+    try:
+        return max(0, int(get_setting("gray_cache_size_mb", DEFAULT_GRAY_CACHE_SIZE_MB)))
+    except (TypeError, ValueError):
+        return DEFAULT_GRAY_CACHE_SIZE_MB
+
+
+def get_gray_cache():
+    """
+    Кэш черно-белых картинок или None, если кэш выключен (--no-cache).
+    """
+    global _gray_cache
+    enabled, _ = get_cache_config()
+    if not enabled:
+        return None
+    with _gray_cache_lock:
+        if _gray_cache is None:
+            _gray_cache = GrayImageCache(os.path.join(DATA_DIR, "gray"),
+                                         get_gray_cache_size_mb() * 1024 * 1024)
+        return _gray_cache
+
+
+def encode_gray(source):
+    """
+    source — путь к картинке или файловый объект (например, BytesIO).
+    """
+    with Image.open(source) as img:
+        image_format = img.format
+        gray = img.convert('L')
+    buffer = io.BytesIO()
+    gray.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def link_or_copy(source, target):
+    """
+    Жёсткая ссылка, если source и target на одном разделе, иначе копия.
+    """
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def make_gray_image(file_path, scratch_dir):
+    """
+    Путь к черно-белой копии во временном каталоге scratch_dir. Рядом с
+    исходной картинкой ничего не пишется. Копия из кэша берётся ссылкой или
+    копированием: pandoc не должен читать запись кэша, которую может
+    вытеснить параллельная конвертация.
+    """
+    gray_path = os.path.join(scratch_dir, uuid.uuid4().hex + os.path.splitext(file_path)[1])
+    cache = get_gray_cache()
+    if cache is not None:
+        key = cache.key_for(file_path)
+        cached_path = cache.get(key)
+        if cached_path is not None:
+            try:
+                link_or_copy(cached_path, gray_path)
+                return gray_path
+            except OSError:
+                # Запись вытеснили между get и копированием — переводим заново
+                pass
+
+    data = encode_gray(file_path)
+    with open(gray_path, "wb") as f:
+        f.write(data)
+    if cache is not None:
+        cache.put_bytes(key, data)
+    return gray_path
+
+
+def make_gray_images(paths, scratch_dir, workers=None):
+    """
+    Черно-белые копии картинок параллельно в потоках: Pillow отпускает GIL
+    при декодировании и сжатии. Возвращает {исходный путь: путь к копии}.
+    """
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+    workers = min(workers or get_default_workers(), len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(paths, executor.map(lambda path: make_gray_image(path, scratch_dir), paths)))
+
+
+def gray_blob(data):
+    try:
+        return encode_gray(io.BytesIO(data))
+    except Exception as e:
+        # Форматы, которые Pillow не читает (emf, wmf ...), остаются как есть
+        print(f"Не удалось перевести картинку в серый цвет: {e}")
+        return data
+
+
+def make_gray_blobs(blobs, workers=None):
+    """
+    То же для картинок в памяти: {имя: bytes} → {имя: bytes в сером цвете}.
+    """
+    if not blobs:
+        return {}
+    names = list(blobs)
+    workers = min(workers or get_default_workers(), len(names))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(names, executor.map(lambda name: gray_blob(blobs[name]), names)))
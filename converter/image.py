@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image
+
+from converter.cache import configure_cache, get_cache_config, run_cached
+from converter.common import make_output_path
+
+IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp"]
+
+FORMAT_MAP = {
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "png": "PNG",
+    "bmp": "BMP",
+    "tiff": "TIFF",
+    "webp": "WEBP"
+}
+
+
+def get_default_workers():
+    return os.cpu_count() or 1
+
+
+def convert_image(file_path, to_format):
+    to_format = to_format.lower()
+    output_path = make_output_path(file_path, to_format)
+
+    image_format = FORMAT_MAP.get(to_format, to_format.upper())
+
+    def convert():
+        image = Image.open(file_path)
+        image = image.convert("RGB") if to_format in ["jpeg", "jpg"] else image
+        image.save(output_path, format=image_format)
+
+    params = {"converter": "image", "format": image_format}
+    return run_cached(file_path, params, output_path, convert)
+
+
+def convert_images_parallel(jobs, workers=None):
+    """
+    Раскладывает пачку изображений по процессам (по умолчанию — по числу ядер).
+    jobs — список пар (путь, целевой формат). Результаты отдаются по мере готовности
+    в виде (путь, путь к результату, текст ошибки или None).
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    workers = min(workers or get_default_workers(), len(jobs))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=configure_cache, initargs=get_cache_config()
+    ) as executor:
+        futures = {executor.submit(convert_image, path, to_format): path for path, to_format in jobs}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield path, future.result(), None
+            except Exception as e:
+                yield path, None, str(e)
@@ -0,0 +1,105 @@
+import io
+import os
+
+from fpdf import FPDF
+from PIL import Image
+
+from converter.cache import run_cached
+from converter.common import make_output_path
+from converter.pdf_writer import StreamingPdfWriter
+
+IMAGE_TO_PDF_EXTENSIONS = [".png", ".jpg", ".jpeg", ".bmp", ".gif"]
+PAGE_FORMATS = ["A4", "A3", "A5"]
+TARGET_DPI_CHOICES = [150, 300]
+
+
+def load_preview(file_path, size):
+    """
+    Открывает изображение сразу в размере предпросмотра. thumbnail() через
+    draft()/reduce() декодирует JPEG в уменьшенном масштабе, поэтому полное
+    изображение в памяти не собирается.
+    """
+    with Image.open(file_path) as img:
+        img.thumbnail(size)
+        return img.convert("RGB")
+
+
+def merge_images_to_pdf(pages, output_path):
+    """
+    Собирает PDF из пар (путь, угол поворота) постранично через
+    StreamingPdfWriter: JPEG копируются в файл без перекодирования,
+    остальные изображения декодируются по одному.
+    """
+    with StreamingPdfWriter(output_path) as writer:
+        for file_path, angle in pages:
+            writer.add_image_page(file_path, angle)
+
+
+def downsample_to_placed_size(file_path, width_pt, height_pt, target_dpi):
+    """
+    Уменьшает изображение до размера, который оно займёт на странице при
+    target_dpi. Возвращает BytesIO с JPEG (для JPEG-исходников) или PNG,
+    либо None, если изображение и так не крупнее нужного.
+    """
+    target = (max(1, round(width_pt / 72 * target_dpi)), max(1, round(height_pt / 72 * target_dpi)))
+    with Image.open(file_path) as img:
+        if img.width <= target[0] and img.height <= target[1]:
+            return None
+        is_jpeg = img.format == "JPEG"
+        # JPEG сразу декодируется в ближайшем масштабе не меньше нужного
+        img.draft("RGB", target)
+        if is_jpeg or not img.has_transparency_data:
+            img = img.convert("RGB")
+        else:
+            img = img.convert("RGBA")
+        resized = img.resize(target, Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if is_jpeg:
+        resized.save(buffer, "JPEG", quality=90)
+    else:
+        resized.save(buffer, "PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def convert_image_to_pdf(file_path, page_format="A4", target_dpi=None, saved_callback=None):
+    """
+    target_dpi (150, 300 ...) — изображение перед вставкой уменьшается до
+    размера на странице при этом разрешении; None — вставляется как есть.
+    saved_callback (если задан) получает, на сколько байт вставленная
+    уменьшенная копия меньше исходного файла (0, если уменьшать не пришлось).
+    Когда PDF берётся из кэша, он не вызывается.
+    """
+    output_path = make_output_path(file_path, "pdf")
+
+    def convert():
+        pdf = FPDF(unit="pt", format=page_format)
+        pdf.add_page()
+
+        # Размеры читаются из заголовка, пиксели не декодируются
+        try:
+            with Image.open(file_path) as img:
+                width, height = img.size
+        except Exception:
+            raise Exception("Невозможно загрузить изображение")
+
+        max_width = pdf.w - 60
+        img_ratio = width / height
+        height = max_width / img_ratio
+
+        image = file_path
+        saved_size = 0
+        if target_dpi:
+            downsampled = downsample_to_placed_size(file_path, max_width, height, target_dpi)
+            if downsampled is not None:
+                image = downsampled
+                saved_size = os.path.getsize(file_path) - downsampled.getbuffer().nbytes
+
+        pdf.image(image, x=30, y=30, w=max_width, h=height)
+        pdf.output(output_path)
+        if saved_callback:
+            saved_callback(saved_size)
+
+    params = {"converter": "image-pdf", "page_format": page_format, "target_dpi": target_dpi}
+    return run_cached(file_path, params, output_path, convert)
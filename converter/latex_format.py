@@ -0,0 +1,152 @@
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+
+from converter.pandoc import run_pandoc
+from converter.settings import DATA_DIR, get_setting
+
+FORMAT_DIR = os.path.join(DATA_DIR, "latex")
+# Преамбула дампится до первой настройки шрифтов: шрифты XeTeX в формат не
+# сохраняются, поэтому fontspec-команды и всё после них выполняются каждый раз
+FONT_SETUP_PATTERN = re.compile(
+    r"^[ \t]*\\(setmainfont|setsansfont|setmonofont|setmathfont|babelfont|begin\{document\})", re.M
+)
+# Условия TeX: \newif и \ifthenelse условий не открывают
+CONDITIONAL_PATTERN = re.compile(r"\\newif\\if[A-Za-z@]+|\\ifthenelse|\\if[A-Za-z@]*|\\fi(?![A-Za-z@])")
+COMMENT_PATTERN = re.compile(r"(?<!\\)%.*")
+# Сколько раз xelatex перезапускается ради оглавления и ссылок (как в pandoc)
+MAX_LATEX_RUNS = 3
+
+_format_locks = {}
+_format_locks_lock = threading.Lock()
+# Если формат собрать не удалось (нет mylatexformat и т.п.), больше не пробуем
+_format_unavailable = False
+
+
+def is_format_enabled():
+    return not _format_unavailable and bool(get_setting("xelatex_format", True))
+
+
+def split_preamble(tex):
+    """
+    Делит LaTeX от pandoc на часть преамбулы, которую можно сохранить в
+    формат, и остаток, который выполняется при каждой компиляции.
+    """
+    match = FONT_SETUP_PATTERN.search(tex)
+    if match is None:
+        return None, tex
+    cut = find_top_level_cut(tex, match.start())
+    return tex[:cut], tex[cut:]
+
+
+def find_top_level_cut(tex, end):
+    """
+    Последнее начало строки не дальше end, где не открыто ни одно условие
+    \\if…\\fi. Иначе в формат попал бы открытый \\ifPDFTeX\\else, а в документ —
+    лишний \\fi (pandoc ставит \\setmainfont внутрь такого условия).
+    """
+    depth = 0
+    cut = 0
+    pos = 0
+    for line in tex[:end].splitlines(keepends=True):
+        if depth == 0:
+            cut = pos
+        for token in CONDITIONAL_PATTERN.findall(COMMENT_PATTERN.sub("", line)):
+            if token.startswith("\\newif") or token == "\\ifthenelse":
+                continue
+            depth += -1 if token == "\\fi" else 1
+        pos += len(line)
+    return end if depth == 0 else cut
+
+
+def get_format_lock(name):
+    with _format_locks_lock:
+        return _format_locks.setdefault(name, threading.Lock())
+
+
+def run_xelatex(args, cwd, env=None):
+    result = subprocess.run(["xelatex", "-interaction=nonstopmode", "-halt-on-error"] + args,
+                            cwd=cwd, env=env, capture_output=True, text=True, errors="replace")
+    if result.returncode != 0:
+        tail = "\n".join(result.stdout.strip().splitlines()[-15:])
+        raise Exception(f"xelatex завершился с ошибкой:\n{tail}")
+    return result.stdout
+
+
+def get_format(prefix):
+    """
+    Путь к формату xelatex (без .fmt) для данной преамбулы. Формат собирается
+    один раз через mylatexformat и дальше берётся из DATA_DIR/latex.
+    """
+    name = "pandoc-" + hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+    format_path = os.path.join(FORMAT_DIR, name)
+    with get_format_lock(name):
+        if os.path.exists(format_path + ".fmt"):
+            return format_path
+        os.makedirs(FORMAT_DIR, exist_ok=True)
+        build_dir = tempfile.mkdtemp(dir=FORMAT_DIR)
+        try:
+            with open(os.path.join(build_dir, name + ".tex"), "w", encoding="utf-8") as f:
+                f.write(prefix + "\\endofdump\n\\begin{document}\n\\end{document}\n")
+            run_xelatex(["-ini", f"-jobname={name}", "&xelatex", "mylatexformat.ltx", name + ".tex"], build_dir)
+            os.replace(os.path.join(build_dir, name + ".fmt"), format_path + ".fmt")
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+    return format_path
+
+
+def compile_tex(prefix, rest, format_path, output_path, resource_dir, work_dir):
+    """
+    Компилирует LaTeX от pandoc с заранее собранным форматом: пакеты из
+    преамбулы не загружаются заново, заново выполняется только настройка шрифтов.
+    Часть до \\endofdump mylatexformat пропускает — она уже в формате.
+    """
+    with open(os.path.join(work_dir, "document.tex"), "w", encoding="utf-8") as f:
+        f.write(prefix + "\\endofdump\n" + rest)
+
+    # Картинки ищутся и рядом с документом, и в стандартных путях TeX
+    env = dict(os.environ, TEXINPUTS=resource_dir + os.pathsep + os.environ.get("TEXINPUTS", ""))
+    for _ in range(MAX_LATEX_RUNS):
+        log = run_xelatex(["-fmt=" + format_path, "document.tex"], work_dir, env)
+        if "Rerun to get" not in log and "Rerun LaTeX" not in log:
+            break
+    shutil.move(os.path.join(work_dir, "document.pdf"), output_path)
+
+
+def convert_to_pdf_with_format(input_path, input_format, output_path, extra_args):
+    """
+    pandoc → LaTeX → xelatex с предкомпилированным форматом. Возвращает False,
+    если формат собрать или применить не удалось — тогда документ
+    конвертируется обычным путём.
+    """
+    global _format_unavailable
+    work_dir = tempfile.mkdtemp()
+    try:
+        tex = run_pandoc(
+            input_path, "latex", input_format,
+            extra_args=["--standalone", f"--extract-media={work_dir}"] + extra_args
+        )
+        prefix, rest = split_preamble(tex)
+        if prefix is None:
+            return False
+        try:
+            format_path = get_format(prefix)
+        except Exception as e:
+            print(f"Предкомпилированный формат xelatex недоступен: {e}")
+            _format_unavailable = True
+            return False
+        # Документ из памяти (bytes) берёт картинки только из извлечённых media
+        resource_dir = os.path.dirname(os.path.abspath(input_path)) if isinstance(input_path, str) else work_dir
+        try:
+            compile_tex(prefix, rest, format_path, output_path, resource_dir, work_dir)
+        except Exception as e:
+            # Что бы ни случилось с форматом, документ ещё можно собрать обычным путём
+            print(f"Не удалось собрать PDF с форматом xelatex, обычная конвертация: {e}")
+            return False
+        return True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,282 @@
+import os
+import asyncio
+import subprocess
+
+from converter.cache import get_cache
+from converter.common import make_output_path
+
+VIDEO_EXTENSIONS = [".mp4", ".avi", ".mkv", ".mov"]
+AUDIO_EXTENSIONS = [".mp3", ".wav", ".flac", ".ogg"]
+
+AUDIO_CONVERSIONS = {
+    '.mp3': ['mp3 → wav', 'mp3 → flac', 'mp3 → ogg'],
+    '.wav': ['wav → mp3', 'wav → flac', 'wav → ogg'],
+    '.flac': ['flac → mp3', 'flac → wav'],
+    '.ogg': ['ogg → mp3', 'ogg → wav']
+}
+
+# Аудиокодеки почти не распараллеливаются, поэтому аудио выгоднее запускать
+# много процессов по одному потоку, а видео — меньше процессов по несколько потоков
+AUDIO_THREADS_PER_JOB = 1
+VIDEO_THREADS_PER_JOB = 4
+
+
+def get_audio_conversions(ext):
+    return AUDIO_CONVERSIONS.get(ext, [])
+
+
+def build_ffmpeg_command(file_path, output_path, threads=None, progress=False):
+    command = ['ffmpeg', '-y', '-nostdin']
+    if progress:
+        # Машиночитаемый прогресс (key=value) идёт в stdout
+        command += ['-progress', 'pipe:1', '-nostats']
+    command += ['-i', file_path]
+    if threads:
+        command += ['-threads', str(threads)]
+    command.append(output_path)
+    return command
+
+
+def build_ffprobe_command(file_path):
+    return ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1', file_path]
+
+
+def parse_duration(text):
+    try:
+        duration = float(text.strip())
+    except ValueError:
+        return None
+    return duration if duration > 0 else None
+
+
+def parse_out_time(values):
+    """
+    Возвращает текущую позицию кодирования в секундах из блока -progress.
+    out_time_ms у ffmpeg на самом деле тоже в микросекундах.
+    """
+    for key in ("out_time_us", "out_time_ms"):
+        value = values.get(key, "N/A")
+        if value.lstrip("-").isdigit():
+            return max(0, int(value)) / 1_000_000
+    value = values.get("out_time", "")
+    parts = value.split(":")
+    if len(parts) == 3:
+        try:
+            return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+        except ValueError:
+            return None
+    return None
+
+
+def parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProgressParser:
+    """
+    Собирает строки key=value из ffmpeg -progress. Блок заканчивается строкой
+    progress=continue|end, после чего feed возвращает словарь с процентом,
+    fps, множителем скорости и оставшимся временем (ETA, секунды).
+    """
+
+    def __init__(self, duration=None):
+        self.duration = duration
+        self.values = {}
+
+    def feed(self, line):
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        self.values[key] = value.strip()
+        if key != "progress":
+            return None
+
+        values, self.values = self.values, {}
+        out_time = parse_out_time(values)
+        fps = parse_float(values.get("fps"))
+        speed = parse_float(values.get("speed", "").rstrip("x"))
+
+        percent = None
+        eta = None
+        if self.duration and out_time is not None:
+            percent = min(100.0, out_time / self.duration * 100)
+            if speed:
+                eta = max(0.0, (self.duration - out_time) / speed)
+        if value.strip() == "end":
+            percent = 100.0
+            eta = 0.0
+
+        return {
+            "percent": percent,
+            "fps": fps,
+            "speed": speed,
+            "eta": eta,
+            "out_time": out_time
+        }
+
+
+def format_progress(info):
+    """
+    Краткая строка о ходе конвертации: «42% · 120 fps · 3.1x · ETA 0:25».
+    """
+    parts = []
+    if info.get("percent") is not None:
+        parts.append(f"{info['percent']:.0f}%")
+    if info.get("fps"):
+        parts.append(f"{info['fps']:.0f} fps")
+    if info.get("speed"):
+        parts.append(f"{info['speed']:.1f}x")
+    if info.get("eta") is not None:
+        minutes, seconds = divmod(int(info["eta"]), 60)
+        parts.append(f"ETA {minutes}:{seconds:02d}")
+    return " · ".join(parts)
+
+
+async def probe_duration(file_path):
+    process = await asyncio.create_subprocess_exec(
+        *build_ffprobe_command(file_path),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        return None
+    return parse_duration(stdout.decode(errors="replace"))
+
+
+async def run_ffmpeg(file_path, to_format, threads=None, progress_callback=None):
+    """
+    Запускает один процесс ffmpeg. Если передан progress_callback, длительность
+    входа берётся из ffprobe, а прогресс читается из -progress pipe:1.
+    """
+    output_path = make_output_path(file_path, to_format.lower())
+
+    cache = get_cache()
+    cache_key = None
+    if cache is not None:
+        # Хэширование большого видео не должно блокировать остальные задачи цикла
+        params = {"converter": "media", "to": to_format.lower()}
+        cache_key = await asyncio.get_running_loop().run_in_executor(
+            None, cache.key_for, file_path, params
+        )
+        if cache.restore(cache_key, output_path):
+            return output_path
+
+    parser = None
+    if progress_callback:
+        try:
+            duration = await probe_duration(file_path)
+        except OSError:
+            duration = None
+        parser = ProgressParser(duration)
+
+    command = build_ffmpeg_command(file_path, output_path, threads, progress=parser is not None)
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE if parser else subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+    async def read_progress():
+        async for line in process.stdout:
+            info = parser.feed(line.decode(errors="replace"))
+            if info is not None:
+                progress_callback(info)
+
+    try:
+        if parser:
+            stderr, _ = await asyncio.gather(process.stderr.read(), read_progress())
+            await process.wait()
+        else:
+            _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise Exception(stderr.decode(errors="replace"))
+    if cache is not None:
+        cache.store(cache_key, output_path)
+    return output_path
+
+
+def convert_media(file_path, to_format, progress_callback=None):
+    """
+    Конвертирует аудио или видео через ffmpeg. Общая функция для обеих категорий.
+    """
+    return asyncio.run(run_ffmpeg(file_path, to_format, progress_callback=progress_callback))
+
+
+class FfmpegScheduler:
+    """
+    Запускает несколько процессов ffmpeg одновременно, остальные задачи ждут в очереди.
+    Если задано только одно из значений, второе подбирается так, чтобы
+    процессы вместе занимали все ядра: max_jobs * threads_per_job ≈ число ядер.
+    """
+
+    def __init__(self, max_jobs=None, threads_per_job=None):
+        cores = os.cpu_count() or 1
+        if max_jobs is None and threads_per_job is None:
+            threads_per_job = AUDIO_THREADS_PER_JOB
+        if max_jobs is None:
+            max_jobs = max(1, cores // threads_per_job)
+        if threads_per_job is None:
+            threads_per_job = max(1, cores // max_jobs)
+        self.max_jobs = max_jobs
+        self.threads_per_job = threads_per_job
+
+    @classmethod
+    def for_audio(cls, max_jobs=None):
+        return cls(max_jobs, AUDIO_THREADS_PER_JOB)
+
+    @classmethod
+    def for_video(cls, max_jobs=None):
+        cores = os.cpu_count() or 1
+        return cls(max_jobs, min(VIDEO_THREADS_PER_JOB, cores))
+
+    async def run_job(self, semaphore, file_path, to_format, progress_callback=None):
+        async with semaphore:
+            callback = None
+            if progress_callback:
+                callback = lambda info: progress_callback(file_path, info)
+            return await run_ffmpeg(file_path, to_format, self.threads_per_job, callback)
+
+    def run(self, jobs, progress_callback=None):
+        """
+        jobs — список пар (путь, целевой формат). Результаты отдаются по мере
+        завершения процессов в виде (путь, путь к результату, текст ошибки или None).
+        progress_callback(путь, словарь прогресса) вызывается из того же потока.
+        """
+        loop = asyncio.new_event_loop()
+        pending = set()
+        try:
+            semaphore = asyncio.Semaphore(self.max_jobs)
+            tasks = {}
+            for file_path, to_format in jobs:
+                task = loop.create_task(self.run_job(semaphore, file_path, to_format, progress_callback))
+                tasks[task] = file_path
+            pending = set(tasks)
+            while pending:
+                done, pending = loop.run_until_complete(
+                    asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        yield tasks[task], task.result(), None
+                    else:
+                        yield tasks[task], None, str(error)
+        finally:
+            # Генератор могли закрыть раньше времени — снимаем оставшиеся задачи
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
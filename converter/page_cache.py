@@ -0,0 +1,62 @@
+import io
+import os
+import threading
+
+from PIL import Image
+
+from converter.cache import DiskCache, file_hash, get_cache_config
+from converter.settings import DATA_DIR, get_setting
+
+DEFAULT_PAGE_CACHE_SIZE_MB = 1024
+# PNG с быстрым сжатием: страница в кэше нужна целиком и без потерь
+PAGE_PNG_COMPRESS_LEVEL = 1
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+class PageCache(DiskCache):
+    """
+    Растеризованные страницы PDF по ключу «хэш содержимого файла + номер
+    страницы + DPI». Пишут в него только предпросмотр редактора и миниатюры,
+    каждый со своим DPI; конвертер PDF → изображения его лишь читает.
+    """
+
+    def key_for(self, file_path, page, dpi):
+        return f"{file_hash(file_path)}-{page}-{dpi}"
+
+    def get_page(self, file_path, page, dpi):
+        return self.get(self.key_for(file_path, page, dpi))
+
+    def put_page(self, file_path, page, dpi, image):
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG", compress_level=PAGE_PNG_COMPRESS_LEVEL)
+        return self.put_bytes(self.key_for(file_path, page, dpi), buffer.getvalue())
+
+
+def get_page_cache_size_mb():
+    try:
+        return max(0, int(get_setting("page_cache_size_mb", DEFAULT_PAGE_CACHE_SIZE_MB)))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_CACHE_SIZE_MB
+
+
+def get_page_cache():
+    """
+    Общий кэш страниц или None, если кэш выключен (--no-cache).
+    """
+    global _page_cache
+    enabled, _ = get_cache_config()
+    if not enabled:
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(os.path.join(DATA_DIR, "pages"),
+                                    get_page_cache_size_mb() * 1024 * 1024)
+        return _page_cache
+
+
+def load_page(path):
+    with Image.open(path) as image:
+        image.load()
+        return image
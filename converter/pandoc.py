@@ -0,0 +1,11 @@
+import pypandoc
+
+
+def run_pandoc(source, to_format, input_format, **kwargs):
+    """
+    source — путь к файлу или содержимое в памяти (bytes), которое pandoc
+    получает через stdin без временного файла.
+    """
+    if isinstance(source, bytes):
+        return pypandoc.convert_text(source, to_format, format=input_format, **kwargs)
+    return pypandoc.convert_file(source, to_format, format=input_format, **kwargs)
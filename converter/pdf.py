@@ -0,0 +1,27 @@
+from pdf2docx import Converter as DocxConverter
+import pdfplumber
+
+from converter.cache import run_cached
+from converter.common import make_output_path
+
+PDF_TARGET_FORMATS = ['docx', 'txt']
+
+
+def convert_pdf(file_path, to_format):
+    to_format = to_format.lower()
+    if to_format not in PDF_TARGET_FORMATS:
+        raise Exception(f"Формат {to_format} не поддерживается.")
+    output_path = make_output_path(file_path, to_format)
+
+    def convert():
+        if to_format == "docx":
+            converter = DocxConverter(file_path)
+            converter.convert(output_path, start=0, end=None)
+            converter.close()
+        elif to_format == "txt":
+            with pdfplumber.open(file_path) as pdf:
+                text = "\n".join(page.extract_text() or '' for page in pdf.pages)
+                with open(output_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+
+    return run_cached(file_path, {"converter": "pdf", "to": to_format}, output_path, convert)
@@ -0,0 +1,53 @@
+import shutil
+
+from converter.settings import get_setting, set_setting
+
+# Движки, которые pandoc умеет запускать через --pdf-engine
+PDF_ENGINES = [
+    "xelatex", "lualatex", "pdflatex", "tectonic",
+    "weasyprint", "wkhtmltopdf", "pagedjs-cli", "prince", "typst"
+]
+LATEX_ENGINES = ("xelatex", "lualatex", "pdflatex", "tectonic")
+DEFAULT_PDF_ENGINE = "xelatex"
+
+# Переменные шаблона pandoc для LaTeX-движков
+PDF_VARIABLES = [
+    '-V', 'mainfont=Arial',
+    '-V', 'lang=ru-RU',
+    '-V', 'geometry=margin=1in'
+]
+
+
+def is_engine_available(engine):
+    return engine in PDF_ENGINES and shutil.which(engine) is not None
+
+
+def get_available_engines():
+    return [engine for engine in PDF_ENGINES if is_engine_available(engine)]
+
+
+def get_pdf_engine(input_format):
+    """
+    Движок для пары «input_format → pdf» из настройки pdf_engines. Если он не
+    задан или не установлен, используется xelatex.
+    """
+    engine = (get_setting("pdf_engines") or {}).get(input_format)
+    if engine and is_engine_available(engine):
+        return engine
+    return DEFAULT_PDF_ENGINE
+
+
+def set_pdf_engine(input_format, engine):
+    engines = dict(get_setting("pdf_engines") or {})
+    if engine:
+        engines[input_format] = engine
+    else:
+        engines.pop(input_format, None)
+    set_setting("pdf_engines", engines)
+
+
+def get_engine_args(engine):
+    args = [f'--pdf-engine={engine}']
+    if engine in LATEX_ENGINES:
+        args.extend(PDF_VARIABLES)
+    return args
@@ -0,0 +1,178 @@
+import io
+import os
+import json
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from converter.cache import run_cached
+from converter.page_cache import get_page_cache, load_page
+
+PDF_IMAGE_FORMATS = ["PNG", "JPEG", "TIFF"]
+
+# DPI по умолчанию у pdf2image, используется для "auto"
+DEFAULT_DPI = 200
+# Сколько страниц растеризуется за один вызов pdftoppm
+PAGES_PER_CHUNK = 4
+# Миниатюры для ленты страниц в редакторе
+THUMBNAIL_DPI = 12
+
+
+def get_state_path(pdf_path):
+    return os.path.splitext(pdf_path)[0] + "_state.json"
+
+
+def load_page_state(pdf_path):
+    """
+    Читает состояние редактора PDF: удалённые страницы и углы поворота.
+    """
+    deleted_pages = set()
+    rotation_angles = {}
+    state_path = get_state_path(pdf_path)
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+            deleted_pages = set(state.get("deleted_pages", []))
+            rotation_angles = state.get("rotation_angles", {})
+    return deleted_pages, rotation_angles
+
+
+def get_output_folder(pdf_path):
+    return os.path.splitext(pdf_path)[0] + "_images"
+
+
+def get_page_count(file_path):
+    return pdfinfo_from_path(file_path)["Pages"]
+
+
+def render_page(file_path, page, dpi=None):
+    """
+    Растеризует одну страницу (номер с нуля), не трогая остальные.
+    Страница берётся из кэша страниц, если её уже рисовали с тем же DPI.
+    """
+    dpi = dpi or DEFAULT_DPI
+    for _, image in iter_pdf_pages(file_path, dpi, [(page + 1, page + 1)]):
+        return image
+
+
+def render_thumbnail(file_path, page, dpi=THUMBNAIL_DPI):
+    """
+    Миниатюра страницы в виде PNG-байтов. Миниатюры лежат в общем кэше
+    страниц, поэтому при повторном открытии документа pdftoppm уже не запускается.
+    """
+    cache = get_page_cache()
+    cached_path = cache.get_page(file_path, page, dpi) if cache else None
+    if cached_path is None:
+        image = render_page(file_path, page, dpi)
+        cached_path = cache.get_page(file_path, page, dpi) if cache else None
+        if cached_path is None:
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG")
+            return buffer.getvalue()
+    with open(cached_path, "rb") as f:
+        return f.read()
+
+
+def plan_page_ranges(page_count, deleted_pages=(), chunk_size=PAGES_PER_CHUNK):
+    """
+    Разбивает оставшиеся после удаления страницы на непрерывные диапазоны
+    (first_page, last_page) с нумерацией с единицы, не длиннее chunk_size.
+    Удалённые страницы в диапазоны не попадают и не растеризуются вовсе.
+    """
+    ranges = []
+    first_page = None
+    for page in range(1, page_count + 2):
+        kept = page <= page_count and (page - 1) not in deleted_pages
+        if kept and first_page is None:
+            first_page = page
+        if first_page is not None and (not kept or page - first_page == chunk_size):
+            ranges.append((first_page, page - 1))
+            first_page = page if kept else None
+    return ranges
+
+
+def render_pages(file_path, dpi, first_page, last_page, cache=None):
+    images = convert_from_path(file_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    for offset in range(len(images)):
+        # Забираем ссылку из списка, чтобы страница освобождалась сразу после сохранения
+        img, images[offset] = images[offset], None
+        page = first_page - 1 + offset
+        if cache is not None:
+            cache.put_page(file_path, page, dpi, img)
+        yield page, img
+
+
+def iter_pdf_pages(file_path, dpi=None, page_ranges=None, store=True):
+    """
+    Отдаёт страницы PDF по одной как (номер с нуля, изображение PIL).
+    Каждый диапазон из page_ranges (по умолчанию весь документ окнами по
+    PAGES_PER_CHUNK) растеризуется отдельным вызовом через first_page/last_page,
+    поэтому в памяти одновременно держится не больше одного окна,
+    какой бы длинный ни был документ. Страницы, которые уже есть в кэше
+    страниц, читаются оттуда, остальные после отрисовки туда сохраняются
+    (если store не выключен).
+    """
+    dpi = dpi or DEFAULT_DPI
+    cache = get_page_cache()
+    store_cache = cache if store else None
+    if page_ranges is None:
+        page_ranges = plan_page_ranges(get_page_count(file_path))
+    for first_page, last_page in page_ranges:
+        # Подряд идущие страницы, которых нет в кэше, рисуются одним вызовом
+        missing_from = None
+        for page in range(first_page - 1, last_page):
+            cached_path = cache.get_page(file_path, page, dpi) if cache else None
+            if cached_path is None:
+                if missing_from is None:
+                    missing_from = page
+                continue
+            if missing_from is not None:
+                yield from render_pages(file_path, dpi, missing_from + 1, page, store_cache)
+                missing_from = None
+            yield page, load_page(cached_path)
+        if missing_from is not None:
+            yield from render_pages(file_path, dpi, missing_from + 1, last_page, store_cache)
+
+
+def convert_pdf_to_images(file_path, image_format="png", dpi=None, progress_callback=None):
+    """
+    progress_callback (если задан) получает словарь {percent, page, pages}
+    после сохранения каждой страницы. Кэш страниц здесь только читается:
+    весь документ в полном разрешении в кэш не пишется — повторную
+    конвертацию и так покрывает run_cached.
+    """
+    image_format = image_format.lower()
+    deleted_pages, rotation_angles = load_page_state(file_path)
+    output_folder = get_output_folder(file_path)
+
+    def convert():
+        page_ranges = plan_page_ranges(get_page_count(file_path), deleted_pages)
+        pages_to_render = sum(last - first + 1 for first, last in page_ranges)
+        os.makedirs(output_folder, exist_ok=True)
+        written_files = []
+
+        for i, img in iter_pdf_pages(file_path, dpi, page_ranges, store=False):
+            angle = rotation_angles.get(str(i), 0)
+            if angle != 0:
+                img = img.rotate(angle, expand=True)
+
+            page_path = os.path.join(output_folder, f"page_{i + 1}.{image_format}")
+            img.save(page_path, image_format.upper())
+            img.close()
+            written_files.append(page_path)
+
+            if progress_callback:
+                progress_callback({
+                    "percent": int(len(written_files) * 100 / pages_to_render),
+                    "page": len(written_files),
+                    "pages": pages_to_render
+                })
+
+        return written_files
+
+    params = {
+        "converter": "pdf-image",
+        "format": image_format,
+        "dpi": dpi,
+        "deleted_pages": sorted(deleted_pages),
+        "rotation_angles": {k: v % 360 for k, v in rotation_angles.items() if v % 360}
+    }
+    return run_cached(file_path, params, output_folder, convert)
@@ -0,0 +1,122 @@
+import io
+import os
+import shutil
+
+from PIL import Image
+
+# Режимы JPEG, которые можно вставить в PDF без перекодирования
+PASSTHROUGH_JPEG_MODES = {"RGB": "/DeviceRGB", "L": "/DeviceGray"}
+JPEG_QUALITY = 90
+
+
+class StreamingPdfWriter:
+    """
+    Пишет PDF из изображений постранично прямо в файл: каждая страница
+    (картинка, поток содержимого и объект страницы) записывается сразу,
+    а дерево страниц и таблица xref — при закрытии. В памяти одновременно
+    держится не больше одного изображения.
+    JPEG в режимах RGB и L вставляются как есть (DCTDecode) без декодирования,
+    поворот задаётся атрибутом /Rotate страницы.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.file = open(output_path, "wb")
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Недописанный PDF не нужен
+            self.file.close()
+            os.remove(self.output_path)
+
+    def new_id(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def begin_object(self, object_id):
+        self.offsets[object_id] = self.file.tell()
+        self.file.write(f"{object_id} 0 obj\n".encode("ascii"))
+
+    def write_object(self, object_id, body):
+        self.begin_object(object_id)
+        self.file.write(body.encode("ascii"))
+        self.file.write(b"\nendobj\n")
+
+    def write_stream(self, object_id, header, data=None, source=None, length=None):
+        """
+        Поток берётся из data (bytes) или копируется из открытого файла source.
+        """
+        if data is not None:
+            length = len(data)
+        self.begin_object(object_id)
+        self.file.write(f"<< {header} /Length {length} >>\nstream\n".encode("ascii"))
+        if data is not None:
+            self.file.write(data)
+        else:
+            shutil.copyfileobj(source, self.file)
+        self.file.write(b"\nendstream\nendobj\n")
+
+    def add_image_page(self, file_path, angle=0):
+        """
+        Добавляет изображение отдельной страницей размером с картинку (72 DPI).
+        angle — поворот против часовой стрелки, как у PIL.Image.rotate.
+        """
+        with Image.open(file_path) as img:
+            width, height = img.size
+            color_space = PASSTHROUGH_JPEG_MODES.get(img.mode)
+            passthrough = img.format == "JPEG" and color_space is not None
+            if not passthrough:
+                buffer = io.BytesIO()
+                img.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY)
+                data = buffer.getvalue()
+                color_space = "/DeviceRGB"
+
+        image_id = self.new_id()
+        header = (f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                  f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /DCTDecode")
+        if passthrough:
+            with open(file_path, "rb") as source:
+                self.write_stream(image_id, header, source=source, length=os.path.getsize(file_path))
+        else:
+            self.write_stream(image_id, header, data=data)
+
+        content_id = self.new_id()
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode("ascii")
+        self.write_stream(content_id, "", data=content)
+
+        page_id = self.new_id()
+        # /Rotate поворачивает страницу по часовой стрелке
+        rotate = (-angle) % 360
+        self.write_object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Rotate {rotate} /Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.write_object(self.PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self.write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>")
+
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n".encode("ascii"))
+        self.file.write(b"0000000000 65535 f \n")
+        for object_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[object_id]:010d} 00000 n \n".encode("ascii"))
+        self.file.write((f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG_ID} 0 R >>\n"
+                         f"startxref\n{xref_offset}\n%%EOF\n").encode("ascii"))
+        self.file.close()
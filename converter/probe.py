@@ -0,0 +1,105 @@
+import os
+import json
+import subprocess
+import threading
+
+from PIL import Image
+from pdf2image import pdfinfo_from_path
+
+from converter.image import IMAGE_EXTENSIONS
+from converter.image_to_pdf import IMAGE_TO_PDF_EXTENSIONS
+from converter.media import VIDEO_EXTENSIONS, AUDIO_EXTENSIONS, parse_float
+
+# Сведения о файлах, прочитанные из заголовков, по (путь, размер, mtime)
+_probe_memo = {}
+_probe_lock = threading.Lock()
+
+
+def probe_image(file_path):
+    """
+    Image.open читает только заголовок, пиксели не декодируются.
+    """
+    with Image.open(file_path) as img:
+        return {"dimensions": img.size, "mode": img.mode, "format": img.format}
+
+
+def parse_page_size(text):
+    # "595.276 x 841.89 pts (A4)" -> (595.276, 841.89)
+    parts = (text or "").split()
+    if len(parts) >= 3 and parts[1] == "x":
+        width, height = parse_float(parts[0]), parse_float(parts[2])
+        if width and height:
+            return width, height
+    return None
+
+
+def probe_pdf(file_path):
+    info = pdfinfo_from_path(file_path)
+    return {"pages": info.get("Pages"), "page_size": parse_page_size(info.get("Page size"))}
+
+
+def build_ffprobe_probe_command(file_path):
+    return ['ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration:stream=codec_type,codec_name,width,height',
+            '-of', 'json', file_path]
+
+
+def probe_media(file_path):
+    result = subprocess.run(build_ffprobe_probe_command(file_path), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(result.stderr.strip() or "ffprobe не смог прочитать файл")
+    data = json.loads(result.stdout or "{}")
+
+    info = {"duration": parse_float(data.get("format", {}).get("duration"))}
+    codecs = []
+    for stream in data.get("streams", []):
+        if stream.get("codec_name") and stream.get("codec_type") in ("video", "audio"):
+            codecs.append(stream["codec_name"])
+        if stream.get("codec_type") == "video" and stream.get("width") and "dimensions" not in info:
+            info["dimensions"] = (stream["width"], stream["height"])
+    info["codecs"] = "/".join(codecs) or None
+    return info
+
+
+def get_prober(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".pdf":
+        return probe_pdf
+    if ext in IMAGE_EXTENSIONS or ext in IMAGE_TO_PDF_EXTENSIONS:
+        return probe_image
+    if ext in VIDEO_EXTENSIONS or ext in AUDIO_EXTENSIONS:
+        return probe_media
+    return None
+
+
+def probe_file(file_path):
+    """
+    Сведения о файле (размеры, страницы, длительность, кодеки) только из
+    заголовков. Результат запоминается по (путь, размер, mtime); если файл
+    прочитать не удалось, возвращается пустой словарь.
+    """
+    prober = get_prober(file_path)
+    if prober is None:
+        return {}
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return {}
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _probe_lock:
+        if memo_key in _probe_memo:
+            return _probe_memo[memo_key]
+
+    try:
+        info = prober(file_path)
+    except Exception as e:
+        print(f"Не удалось прочитать сведения о файле {file_path}: {e}")
+        info = {}
+
+    with _probe_lock:
+        _probe_memo[memo_key] = info
+    return info
+
+
+def probe_files(paths):
+    return {path: probe_file(path) for path in paths}
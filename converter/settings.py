@@ -0,0 +1,32 @@
+import os
+import json
+
+# Каталог для кэшей и настроек консольного ядра; можно переопределить переменной окружения
+DATA_DIR = os.environ.get("CONVERTOR_HOME", os.path.join(os.path.expanduser("~"), ".convertor"))
+SETTINGS_PATH = os.path.join(DATA_DIR, "settings.json")
+
+
+def load_settings():
+    if os.path.exists(SETTINGS_PATH):
+        try:
+            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Не удалось прочитать настройки: {e}")
+    return {}
+
+
+def save_settings(settings):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2, ensure_ascii=False)
+
+
+def get_setting(key, default=None):
+    return load_settings().get(key, default)
+
+
+def set_setting(key, value):
+    settings = load_settings()
+    settings[key] = value
+    save_settings(settings)
@@ -0,0 +1,93 @@
+import os
+import mmap
+import struct
+from array import array
+
+# Заголовок индекса: размер файла, mtime_ns и строк на страницу
+INDEX_HEADER = struct.Struct("<QQI")
+INDEX_SUFFIX = ".lineindex"
+
+
+def get_index_path(file_path):
+    # Индекс лежит рядом с .editstate
+    return file_path + INDEX_SUFFIX
+
+
+def build_page_index(file_path, lines_per_page):
+    """
+    Смещения начала каждой страницы (каждой lines_per_page-й строки) в байтах.
+    Файл проходится один раз через mmap и целиком в память не читается.
+    """
+    offsets = array("Q")
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return offsets
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 0
+        while pos < size:
+            offsets.append(pos)
+            for _ in range(lines_per_page):
+                end = mm.find(b"\n", pos)
+                if end < 0:
+                    pos = size
+                    break
+                pos = end + 1
+                if pos >= size:
+                    break
+    return offsets
+
+
+def load_page_index(file_path, lines_per_page):
+    """
+    Сохранённый индекс или None, если его нет или файл с тех пор изменился.
+    """
+    index_path = get_index_path(file_path)
+    if not os.path.exists(index_path):
+        return None
+    stat = os.stat(file_path)
+    try:
+        with open(index_path, "rb") as f:
+            size, mtime_ns, saved_lines = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if (size, mtime_ns, saved_lines) != (stat.st_size, stat.st_mtime_ns, lines_per_page):
+                return None
+            offsets = array("Q")
+            offsets.frombytes(f.read())
+            return offsets
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def save_page_index(file_path, lines_per_page, offsets):
+    stat = os.stat(file_path)
+    try:
+        with open(get_index_path(file_path), "wb") as f:
+            f.write(INDEX_HEADER.pack(stat.st_size, stat.st_mtime_ns, lines_per_page))
+            offsets.tofile(f)
+    except OSError as e:
+        print(f"Не удалось сохранить индекс строк {file_path}: {e}")
+
+
+def get_page_index(file_path, lines_per_page):
+    offsets = load_page_index(file_path, lines_per_page)
+    if offsets is None:
+        offsets = build_page_index(file_path, lines_per_page)
+        save_page_index(file_path, lines_per_page, offsets)
+    return offsets
+
+
+def read_page_lines(file_path, offsets, page, encoding="utf-8"):
+    """
+    Строки одной страницы: чтение с нужного смещения, без прохода по файлу.
+    Строки делятся только по \n, как и в индексе: splitlines() резал бы ещё
+    по \r, \f и другим разделителям, и страницы разошлись бы со смещениями.
+    """
+    start = offsets[page]
+    end = offsets[page + 1] if page + 1 < len(offsets) else os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = data.decode(encoding, errors="replace").split("\n")
+    if lines[-1] == "":
+        # После последнего \n строки нет
+        lines.pop()
+    return [line[:-1] if line.endswith("\r") else line for line in lines]
@@ -0,0 +1,194 @@
+import os
+import re
+
+from fpdf import FPDF, XPos, YPos
+
+from converter.settings import get_setting
+
+# Шрифт с кириллицей: тот же Arial, что и у xelatex, или похожий системный
+TEXT_PDF_FONTS = [
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts", "arial.ttf"),
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/usr/share/fonts/truetype/msttcorefonts/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+]
+TEXT_PDF_EXTENSIONS = (".txt", ".md")
+
+FONT_SIZE = 11
+HEADING_SIZES = {1: 20, 2: 16, 3: 14}
+# Поля 1 дюйм, как у pandoc с geometry=margin=1in
+PAGE_MARGIN = 72
+# Абзац длиннее этого выводится частями, чтобы не копить в памяти весь файл
+MAX_PARAGRAPH_CHARS = 64 * 1024
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+LIST_ITEM_PATTERN = re.compile(r"^(\s*)([-+*]|\d+[.)])\s+(.*)$")
+# Всё, что pandoc превращает в разметку: выделение, ссылки, код, таблицы,
+# формулы, HTML, сущности &amp; и команды LaTeX, а также типографика smart
+# (--, ..., прямые кавычки). С такими файлами работает pandoc + xelatex
+COMPLEX_MARKDOWN_PATTERN = re.compile(
+    r"[\\$`|<>\[\]*~^\"']|--|\.\.\.|&\w+;|&#\d+;|(^|\W)_\S|\S_(\W|$)"
+    r"|^\s*(```|:::|=+\s*$|-{3,}\s*$)"
+)
+# Списки с буквами, римскими цифрами, #. и (@), списки определений (:   ...)
+FANCY_LIST_PATTERN = re.compile(r"^\s*(([a-zA-Z]|[ivxlcdmIVXLCDM]+|#)[.)]|\(@\w*\)|:)\s")
+# Код с отступом (или абзац внутри пункта списка) после пустой строки
+INDENTED_CODE_PATTERN = re.compile(r"^( {4}|\t)")
+# Горизонтальная черта с пробелами: - - -, _ _ _
+THEMATIC_BREAK_PATTERN = re.compile(r"^ {0,3}([-*_])([ \t]*\1){2,}[ \t]*$")
+# Подчёркивание заголовка в стиле setext сразу под строкой текста
+SETEXT_UNDERLINE_PATTERN = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+# Переносы строк fpdf2 раскладывает примерно 15 страниц в секунду: файлы
+# больше этого xelatex собирает быстрее
+DEFAULT_TEXT_PDF_MAX_KB = 256
+
+
+def find_text_pdf_font():
+    font = get_setting("text_pdf_font")
+    if font and os.path.isfile(font):
+        return font
+    for path in TEXT_PDF_FONTS:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def is_simple_markdown(file_path):
+    """
+    True, если в файле только абзацы, заголовки # и простые списки — то, что
+    можно набрать без LaTeX. Файл читается построчно до первой сложной конструкции.
+    Строка оценивается вместе с предыдущей: вложенные списки, продолжение
+    пункта без отступа и код с отступом fpdf2 набрал бы не так, как pandoc.
+    """
+    previous = "blank"
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line.strip():
+                    previous = "blank"
+                    continue
+                # Два пробела в конце строки — жёсткий перенос
+                if line.endswith("  ") or FANCY_LIST_PATTERN.match(line):
+                    return False
+                if previous == "blank" and INDENTED_CODE_PATTERN.match(line):
+                    return False
+                if THEMATIC_BREAK_PATTERN.match(line):
+                    return False
+                if previous == "text" and SETEXT_UNDERLINE_PATTERN.match(line):
+                    return False
+
+                kind = "text"
+                item = LIST_ITEM_PATTERN.match(line)
+                if item:
+                    # Вложенный пункт или пункт прямо под абзацем (для pandoc это текст абзаца)
+                    if item.group(1) or previous == "text":
+                        return False
+                    line = item.group(3)
+                    # "- a. текст" и "- 1. текст" — это уже вложенный список
+                    if LIST_ITEM_PATTERN.match(line) or FANCY_LIST_PATTERN.match(line):
+                        return False
+                    kind = "item"
+                heading = HEADING_PATTERN.match(line)
+                if heading:
+                    line = heading.group(2)
+                    kind = "heading"
+                elif kind == "text" and previous == "item":
+                    # Ленивое продолжение: pandoc допишет строку к пункту, а не начнёт абзац
+                    return False
+                if COMPLEX_MARKDOWN_PATTERN.search(line):
+                    return False
+                previous = kind
+    except (OSError, UnicodeDecodeError):
+        return False
+    return True
+
+
+def get_text_pdf_max_bytes():
+    try:
+        return max(0, int(get_setting("text_pdf_max_kb", DEFAULT_TEXT_PDF_MAX_KB))) * 1024
+    except (TypeError, ValueError):
+        return DEFAULT_TEXT_PDF_MAX_KB * 1024
+
+
+def can_convert_text_to_pdf(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in TEXT_PDF_EXTENSIONS or find_text_pdf_font() is None:
+        return False
+    try:
+        if os.path.getsize(file_path) > get_text_pdf_max_bytes():
+            return False
+    except OSError:
+        return False
+    return is_simple_markdown(file_path)
+
+
+def iter_markdown_blocks(file_path):
+    """
+    Блоки простого markdown: ("heading", уровень, текст), ("item", маркер, текст)
+    и ("paragraph", None, текст). Строки абзаца склеиваются, как это делает pandoc.
+    """
+    paragraph = []
+    paragraph_chars = 0
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            heading = HEADING_PATTERN.match(line)
+            item = LIST_ITEM_PATTERN.match(line)
+            if not line.strip() or heading or item:
+                if paragraph:
+                    yield "paragraph", None, " ".join(paragraph)
+                    paragraph, paragraph_chars = [], 0
+                if heading:
+                    yield "heading", len(heading.group(1)), heading.group(2)
+                elif item:
+                    marker = item.group(2)
+                    yield "item", "•" if marker in "-+*" else marker, item.group(3)
+                continue
+            paragraph.append(line.strip())
+            paragraph_chars += len(line)
+            if paragraph_chars >= MAX_PARAGRAPH_CHARS:
+                yield "paragraph", None, " ".join(paragraph)
+                paragraph, paragraph_chars = [], 0
+    if paragraph:
+        yield "paragraph", None, " ".join(paragraph)
+
+
+def convert_text_to_pdf(file_path, output_path):
+    """
+    Набирает простой текст/markdown в PDF средствами fpdf2, без pandoc и LaTeX.
+    Файл читается построчно, блоки сразу раскладываются по страницам.
+    """
+    font_path = find_text_pdf_font()
+    if font_path is None:
+        raise Exception("Не найден шрифт для PDF (укажите text_pdf_font в настройках)")
+
+    pdf = FPDF(unit="pt", format="A4")
+    pdf.set_margins(PAGE_MARGIN, PAGE_MARGIN, PAGE_MARGIN)
+    pdf.set_auto_page_break(True, margin=PAGE_MARGIN)
+    pdf.add_font("text", fname=font_path)
+    pdf.add_page()
+    line_height = FONT_SIZE * 1.4
+    # После каждого блока — с новой строки от левого поля
+    next_line = {"new_x": XPos.LMARGIN, "new_y": YPos.NEXT}
+
+    for kind, value, text in iter_markdown_blocks(file_path):
+        if kind == "heading":
+            size = HEADING_SIZES.get(value, FONT_SIZE + 1)
+            pdf.set_font("text", size=size)
+            pdf.ln(size * 0.5)
+            pdf.multi_cell(0, size * 1.3, text, **next_line)
+            pdf.ln(size * 0.2)
+        elif kind == "item":
+            pdf.set_font("text", size=FONT_SIZE)
+            indent = FONT_SIZE * 1.5
+            pdf.cell(indent, line_height, value)
+            pdf.multi_cell(0, line_height, text, **next_line)
+        else:
+            pdf.set_font("text", size=FONT_SIZE)
+            pdf.multi_cell(0, line_height, text, **next_line)
+            pdf.ln(FONT_SIZE * 0.6)
+
+    pdf.output(output_path)
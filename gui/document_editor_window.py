@@ -2,15 +2,37 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout,
     QGraphicsView, QGraphicsScene, QFileDialog, QMessageBox, QDialog
 )
-from PySide6.QtGui import QPixmap, QImage, QTransform
+from PySide6.QtGui import QPixmap, QTransform
 from PySide6.QtCore import Qt
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, ImageQt
+from collections import OrderedDict
 import os
-import tempfile
-import uuid
 import docx2txt
 import json
 
+from converter.text_index import get_page_index, read_page_lines
+
+LINES_PER_PAGE = 40
+# Сколько отрисованных страниц держать в памяти
+PAGE_CACHE_SIZE = 8
+
+_fonts = {}
+
+
+def get_font(font_size):
+    """
+    Шрифт загружается один раз на размер и дальше берётся из памяти.
+    """
+    font = _fonts.get(font_size)
+    if font is None:
+        try:
+            font = ImageFont.truetype("arial.ttf", font_size)
+        except OSError:
+            font = ImageFont.load_default()
+        _fonts[font_size] = font
+    return font
+
+
 class DocumentEditorWindow(QDialog):
     def __init__(self, file_path, on_save_callback=None):
         super().__init__()
@@ -19,8 +41,12 @@ class DocumentEditorWindow(QDialog):
         self.setWindowTitle("Редактирование документа")
         self.resize(800, 600)
 
-        self.temp_dir = tempfile.mkdtemp()
-        self.page_images = []
+        self.lines = []
+        # Для текстовых файлов — смещения начала страниц вместо самих строк
+        self.page_offsets = None
+        self.page_count = 0
+        # Страницы рисуются по требованию, последние PAGE_CACHE_SIZE хранятся здесь
+        self.page_cache = OrderedDict()
         self.current_index = 0
         self.rotation_angles = {}
         self.deleted_pages = set()
@@ -84,33 +110,20 @@ class DocumentEditorWindow(QDialog):
     def load_file(self):
         ext = os.path.splitext(self.file_path)[1].lower()
         if ext == ".docx":
-            text = docx2txt.process(self.file_path)
+            self.lines = docx2txt.process(self.file_path).splitlines()
+            self.page_count = (len(self.lines) + LINES_PER_PAGE - 1) // LINES_PER_PAGE
         elif ext in (".txt", ".md", ".rtf"):
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                text = f.read()
+            # Большие текстовые файлы не читаются целиком: страница берётся по смещению
+            self.page_offsets = get_page_index(self.file_path, LINES_PER_PAGE)
+            self.page_count = len(self.page_offsets)
         else:
             QMessageBox.critical(self, "Ошибка", f"Формат {ext} не поддерживается")
             return
 
-        lines = text.splitlines()
-        lines_per_page = 40
-        for i in range(0, len(lines), lines_per_page):
-            page_text = "\n".join(lines[i:i + lines_per_page])
-            img = self.text_to_image(page_text)
-            img_path = os.path.join(self.temp_dir, f"page_{uuid.uuid4().hex}.png")
-            img.save(img_path)
-            self.page_images.append(img_path)
-            if i // lines_per_page not in self.rotation_angles:
-                self.rotation_angles[i // lines_per_page] = 0
-
     def text_to_image(self, text, width=800, height=1000, font_size=16):
         img = Image.new("RGB", (width, height), color="white")
         draw = ImageDraw.Draw(img)
-
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font = get_font(font_size)
 
         margin = 20
         y = margin
@@ -119,24 +132,38 @@ class DocumentEditorWindow(QDialog):
             y += font_size + 4
         return img
 
+    def get_page_lines(self, page):
+        if self.page_offsets is not None:
+            return read_page_lines(self.file_path, self.page_offsets, page)
+        start = page * LINES_PER_PAGE
+        return self.lines[start:start + LINES_PER_PAGE]
+
+    def get_page_pixmap(self, page):
+        pixmap = self.page_cache.get(page)
+        if pixmap is None:
+            image = self.text_to_image("\n".join(self.get_page_lines(page)))
+            pixmap = QPixmap.fromImage(ImageQt.ImageQt(image))
+            self.page_cache[page] = pixmap
+            while len(self.page_cache) > PAGE_CACHE_SIZE:
+                self.page_cache.popitem(last=False)
+        self.page_cache.move_to_end(page)
+        return pixmap
+
     def update_preview(self):
-        if not self.page_images:
+        if not self.page_count:
             return
 
         while self.current_index in self.deleted_pages:
             self.current_index += 1
-            if self.current_index >= len(self.page_images):
+            if self.current_index >= self.page_count:
                 self.current_index = 0
             if self.current_index in self.deleted_pages:
                 continue
             else:
                 break
 
-        image_path = self.page_images[self.current_index]
         angle = self.rotation_angles.get(self.current_index, 0)
-
-        image = QImage(image_path)
-        pixmap = QPixmap.fromImage(image)
+        pixmap = self.get_page_pixmap(self.current_index)
 
         if angle != 0:
             transform = QTransform().rotate(angle)
@@ -145,12 +172,12 @@ class DocumentEditorWindow(QDialog):
         self.scene.clear()
         self.scene.addPixmap(pixmap)
         self.view.fitInView(self.scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
-        self.page_label.setText(f"Страница {self.current_index + 1} из {len(self.page_images)}")
+        self.page_label.setText(f"Страница {self.current_index + 1} из {self.page_count}")
 
     def next_page(self):
         original_index = self.current_index
         while True:
-            self.current_index = (self.current_index + 1) % len(self.page_images)
+            self.current_index = (self.current_index + 1) % self.page_count
             if self.current_index not in self.deleted_pages:
                 break
             if self.current_index == original_index:
@@ -160,7 +187,7 @@ class DocumentEditorWindow(QDialog):
     def prev_page(self):
         original_index = self.current_index
         while True:
-            self.current_index = (self.current_index - 1) % len(self.page_images)
+            self.current_index = (self.current_index - 1) % self.page_count
             if self.current_index not in self.deleted_pages:
                 break
             if self.current_index == original_index:
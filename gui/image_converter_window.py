@@ -1,18 +1,25 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog,
-    QComboBox, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QHeaderView, QAbstractItemView, QProgressBar
+    QComboBox, QHBoxLayout, QProgressBar, QSpinBox
 )
 from PySide6.QtCore import Qt
-from PIL import Image
 import os
 
+from gui.job_table import JobTableModel, JobTableView, Column, format_kb, format_dimensions
+from gui.scanner import FileScanner
+from gui.workers import ConversionWorker, BatchWorker, get_thread_pool
+from converter.probe import probe_files
+from converter.common import parse_conversion
+from converter.image import convert_image, convert_images_parallel, get_default_workers, IMAGE_EXTENSIONS
+
 
 class ImageConverterWindow(QWidget):
     def __init__(self, back_callback):
         super().__init__()
         self.back_callback = back_callback
-        self.selected_files = []
+        self.running_jobs = set()
+        self.scanners = set()
+        self.thread_pool = get_thread_pool()
 
         self.setStyleSheet("font-size: 14px;")
         self.setWindowTitle("Конвертация изображений")
@@ -41,6 +48,14 @@ class ImageConverterWindow(QWidget):
         self.global_combo.currentTextChanged.connect(self.apply_global_format)
         global_layout.addWidget(global_label)
         global_layout.addWidget(self.global_combo)
+
+        # Число процессов для пакетной конвертации
+        workers_label = QLabel("Процессов:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(64, get_default_workers()))
+        self.workers_spin.setValue(get_default_workers())
+        global_layout.addWidget(workers_label)
+        global_layout.addWidget(self.workers_spin)
         layout.addLayout(global_layout)
 
         # Общий прогресс
@@ -50,19 +65,17 @@ class ImageConverterWindow(QWidget):
         layout.addWidget(self.progress_overall)
 
         # Таблица
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
-            "Файл", "Формат", "Удалить", "Конвертировать", "Статус", "Входной размер", "Выходной размер"
-        ])
-        self.table.setColumnWidth(0, 220)
-        self.table.setColumnWidth(1, 110)
-        self.table.setColumnWidth(2, 90)
-        self.table.setColumnWidth(3, 130)
-        self.table.setColumnWidth(5, 130)
-        self.table.setColumnWidth(6, 130)
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
-        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.model = JobTableModel([
+            Column("name", "Файл", width=220),
+            Column("conversion", "Формат", kind="choice", width=130),
+            Column("delete", "Удалить", kind="button", callback=self.remove_file, width=90),
+            Column("convert", "Конвертировать", kind="button", callback=self.convert_single, width=130),
+            Column("progress", "Статус", kind="progress", stretch=True),
+            Column("input_size", "Входной размер", formatter=format_kb, width=130),
+            Column("dimensions", "Размеры", formatter=format_dimensions, width=110),
+            Column("output_size", "Выходной размер", formatter=format_kb, width=130),
+        ], self)
+        self.table = JobTableView(self.model)
         layout.addWidget(self.table)
 
         # Кнопки
@@ -71,6 +84,10 @@ class ImageConverterWindow(QWidget):
         add_button.clicked.connect(self.add_images)
         button_layout.addWidget(add_button)
 
+        add_folder_button = QPushButton("Добавить папку")
+        add_folder_button.clicked.connect(self.add_folder)
+        button_layout.addWidget(add_folder_button)
+
         delete_all_button = QPushButton("Удалить все")
         delete_all_button.clicked.connect(self.clear_all)
         button_layout.addWidget(delete_all_button)
@@ -90,142 +107,130 @@ class ImageConverterWindow(QWidget):
         files, _ = QFileDialog.getOpenFileNames(self, "Выберите изображения",
                                                 "", "Изображения (*.png *.jpg "
                                                     "*.jpeg *.bmp *.tiff *.webp)")
-        for file_path in files:
-            if file_path not in self.selected_files and len(self.selected_files) < 50:
-                self.selected_files.append(file_path)
-                self.add_row(file_path)
+        self.start_scan(files)
 
-    def clear_all(self):
-        self.table.setRowCount(0)
-        self.selected_files.clear()
-        self.progress_overall.setValue(0)
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите папку")
+        if folder:
+            self.start_scan([folder])
 
-    def add_row(self, file_path):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
+    def start_scan(self, paths):
+        if not paths:
+            return
+        # Обход папок и чтение размеров идут в фоне, строки добавляются пачками
+        scanner = FileScanner(paths, IMAGE_EXTENSIONS)
+        scanner.signals.batch.connect(self.on_scan_batch)
+        scanner.signals.finished.connect(lambda _, s=scanner: self.scanners.discard(s))
+        self.scanners.add(scanner)
+        self.thread_pool.start(scanner)
+
+    def on_scan_batch(self, scanner, entries):
+        # Пачка могла встать в очередь до «Удалить все»
+        if scanner.cancelled:
+            return
+        self.model.add_files(entries, self.make_job)
+        self.update_progress_bar()
+        self.start_probe([path for path, _ in entries])
 
-        file_name = os.path.basename(file_path)
-        self.table.setItem(row, 0, QTableWidgetItem(file_name))
+    def start_probe(self, paths):
+        # Сведения о файлах читаются из заголовков в фоне, без декодирования
+        worker = ConversionWorker("probe", probe_files, paths)
+        worker.signals.finished.connect(self.on_probe_finished)
+        self.thread_pool.start(worker)
 
-        # Формат
+    def on_probe_finished(self, _, results):
+        self.model.update_jobs(results)
+
+    def clear_all(self):
+        for scanner in self.scanners:
+            scanner.cancel()
+        self.scanners.clear()
+        self.model.clear()
+        self.progress_overall.setValue(0)
+
+    def get_conversion_text(self, file_path):
         ext = os.path.splitext(file_path)[1].lower().replace(".", "")
-        target_format = self.global_combo.currentText()
-        combo_text = f"{ext} → {target_format}" if ext != target_format else f"{ext} → {ext}"
-
-        format_combo = QComboBox()
-        format_combo.addItem(combo_text)
-        self.table.setCellWidget(row, 1, format_combo)
-
-        # Удалить
-        delete_btn = QPushButton("Удалить")
-        delete_btn.clicked.connect(lambda _, r=row: self.remove_row(r))
-        self.table.setCellWidget(row, 2, delete_btn)
-
-        # Конвертировать
-        convert_btn = QPushButton("Конвертировать")
-        convert_btn.clicked.connect(lambda _, r=row: self.convert_single(r))
-        self.table.setCellWidget(row, 3, convert_btn)
-
-        # Статус
-        progress = QProgressBar()
-        progress.setValue(0)
-        progress.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.table.setCellWidget(row, 4, progress)
-
-        # Входной размер
-        if os.path.exists(file_path):
-            input_size = os.path.getsize(file_path)
-            self.table.setItem(row, 5, QTableWidgetItem(f"{input_size / 1024:.1f} KB"))
-        else:
-            self.table.setItem(row, 5, QTableWidgetItem("—"))
-
-        # Выходной размер (заполнится после конвертации)
-        self.table.setItem(row, 6, QTableWidgetItem("—"))
-
-    def remove_row(self, row):
-        if 0 <= row < self.table.rowCount():
-            file_path = self.selected_files[row]
-            self.selected_files.remove(file_path)
-            self.table.removeRow(row)
-            self.update_progress_bar()
+        target_format = self.global_combo.currentText().split("→")[-1].strip()
+        return f"{ext} → {target_format}" if ext != target_format else f"{ext} → {ext}"
+
+    def make_job(self, file_path):
+        conversion = self.get_conversion_text(file_path)
+        return {
+            "conversion": conversion,
+            "conversion_choices": [conversion],
+            "output_size": None
+        }
+
+    def remove_file(self, file_path):
+        self.model.remove_path(file_path)
+        self.update_progress_bar()
 
     def update_progress_bar(self):
-        total = self.table.rowCount()
-        if total == 0:
-            self.progress_overall.setValue(0)
-            return
-
-        completed = 0
-        for row in range(total):
-            widget = self.table.cellWidget(row, 4)
-            if isinstance(widget, QProgressBar) and widget.value() == 100:
-                completed += 1
-        self.progress_overall.setValue(int((completed / total) * 100))
+        self.progress_overall.setValue(self.model.completed_percent())
 
     def convert_all(self):
-        for row in range(self.table.rowCount()):
-            self.convert_single(row)
-
-    def convert_single(self, row):
-        if row >= len(self.selected_files):
+        # Все изображения уходят одним пакетом в пул процессов,
+        # результаты приходят по мере готовности каждого файла
+        jobs = []
+        for job in self.model.jobs:
+            file_path = job["path"]
+            if file_path in self.running_jobs:
+                continue
+            try:
+                from_format, to_format = parse_conversion(job["conversion"])
+            except Exception as e:
+                self.on_conversion_failed(file_path, str(e))
+                continue
+            jobs.append((file_path, to_format.lower()))
+
+        if not jobs:
             return
 
-        file_path = self.selected_files[row]
-        combo = self.table.cellWidget(row, 1)
-        selected_conversion = combo.currentText()
-        progress_bar = self.table.cellWidget(row, 4)
+        keys = [file_path for file_path, _ in jobs]
+        for file_path in keys:
+            self.model.update_job(file_path, progress=10, error=None)
+        worker = BatchWorker(keys, convert_images_parallel, jobs, self.workers_spin.value())
+        worker.signals.finished.connect(self.on_conversion_finished)
+        worker.signals.failed.connect(self.on_conversion_failed)
+        self.running_jobs.update(keys)
+        self.thread_pool.start(worker)
+
+    def convert_single(self, file_path):
+        job = self.model.job(file_path)
+        if job is None or file_path in self.running_jobs:
+            return
 
         try:
-            progress_bar.setValue(10)
-            if '→' not in selected_conversion:
-                raise Exception("Неверный формат выбора")
-
-            from_format, to_format = [s.strip().lower() for s in selected_conversion.split('→')]
-            output_path = os.path.splitext(file_path)[0] + f"_converted.{to_format}"
-
-            image = Image.open(file_path)
-            image = image.convert("RGB") if to_format in ["jpeg", "jpg"] else image
-            format_map = {
-                "jpg": "JPEG",
-                "jpeg": "JPEG",
-                "png": "PNG",
-                "bmp": "BMP",
-                "tiff": "TIFF",
-                "webp": "WEBP"
-            }
-            image_format = format_map.get(to_format.lower(), to_format.upper())
-            image.save(output_path, format=image_format)
-
-            # Получить размер
-            if os.path.exists(output_path):
-                output_size = os.path.getsize(output_path)
-                self.table.setItem(row, 6, QTableWidgetItem(f"{output_size / 1024:.1f} KB"))
-
-            progress_bar.setValue(100)
-
+            from_format, to_format = parse_conversion(job["conversion"])
+            worker = ConversionWorker(file_path, convert_image, file_path, to_format.lower())
         except Exception as e:
-            from PySide6.QtWidgets import QLabel
-            error_label = QLabel("Ошибка: " + str(e))
-            error_label.setStyleSheet("color: red;")
-            self.table.setCellWidget(row, 4, error_label)
-            print(f"Ошибка при конвертации изображения: {e}")
+            self.on_conversion_failed(file_path, str(e))
+            return
 
+        self.model.update_job(file_path, progress=10, error=None)
+        worker.signals.finished.connect(self.on_conversion_finished)
+        worker.signals.failed.connect(self.on_conversion_failed)
+        self.running_jobs.add(file_path)
+        self.thread_pool.start(worker)
+
+    def on_conversion_finished(self, file_path, output_path):
+        self.running_jobs.discard(file_path)
+        # Получить размер
+        output_size = os.path.getsize(output_path) if os.path.exists(output_path) else None
+        self.model.update_job(file_path, progress=100, output_size=output_size)
+        self.update_progress_bar()
+
+    def on_conversion_failed(self, file_path, message):
+        self.running_jobs.discard(file_path)
+        self.model.update_job(file_path, error=message)
         self.update_progress_bar()
 
     def apply_global_format(self, conversion_text):
-        try:
-            _, to_format = [s.strip().lower() for s in conversion_text.split("→")]
-        except ValueError:
+        if "→" not in conversion_text:
             return
 
-        for row in range(self.table.rowCount()):
-            file_path = self.selected_files[row]
-            ext = os.path.splitext(file_path)[1].lower().replace(".", "")
-            combo = self.table.cellWidget(row, 1)
-            if combo:
-                combo.clear()
-                if ext != to_format:
-                    combo.addItem(f"{ext} → {to_format}")
-                else:
-                    combo.addItem(f"{ext} → {ext}")
+        def update(job):
+            job["conversion_choices"] = [self.get_conversion_text(job["path"])]
+            return job["conversion_choices"][0]
 
+        self.model.set_for_all("conversion", update)
@@ -6,7 +6,15 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QPixmap, QImage
 from PySide6.QtCore import Qt
-from PIL import Image, ImageQt
+from collections import OrderedDict
+from PIL import ImageQt
+
+from converter.image_to_pdf import load_preview, merge_images_to_pdf
+
+# Предпросмотр декодируется не больше этого размера
+PREVIEW_SIZE = (1600, 1600)
+# Сколько готовых предпросмотров держится в памяти
+PREVIEW_CACHE_SIZE = 8
 
 
 class ImageToPdfEditorWindow(QWidget):
@@ -16,7 +24,8 @@ class ImageToPdfEditorWindow(QWidget):
         self.setMinimumSize(800, 600)
 
         self.image_paths = image_paths
-        self.images = [Image.open(path).convert("RGB") for path in image_paths]
+        # Изображения открываются только при показе
+        self.previews = OrderedDict()
         self.rotation_angles = {}
         self.deleted_indices = set()
         self.current_index = 0
@@ -76,14 +85,19 @@ class ImageToPdfEditorWindow(QWidget):
         self.setLayout(layout)
 
     def update_preview(self):
-        visible_indices = [i for i in range(len(self.images)) if i not in self.deleted_indices]
+        visible_indices = [i for i in range(len(self.image_paths)) if i not in self.deleted_indices]
         if not visible_indices:
             self.page_info_label.setText("Все изображения удалены.")
             self.image_label.clear()
             return
 
         index = visible_indices[self.current_index]
-        image = self.images[index]
+        try:
+            image = self.get_preview(index)
+        except Exception as e:
+            self.image_label.clear()
+            self.page_info_label.setText(f"Не удалось открыть изображение:\n{e}")
+            return
         angle = self.rotation_angles.get(str(index), 0)
         if angle != 0:
             image = image.rotate(angle, expand=True)
@@ -98,8 +112,18 @@ class ImageToPdfEditorWindow(QWidget):
             f"Изображение {self.current_index + 1} из {len(visible_indices)}"
         )
 
+    def get_preview(self, index):
+        image = self.previews.get(index)
+        if image is None:
+            image = load_preview(self.image_paths[index], PREVIEW_SIZE)
+            self.previews[index] = image
+            while len(self.previews) > PREVIEW_CACHE_SIZE:
+                self.previews.popitem(last=False)
+        self.previews.move_to_end(index)
+        return image
+
     def next_image(self):
-        visible_indices = [i for i in range(len(self.images)) if i not in self.deleted_indices]
+        visible_indices = [i for i in range(len(self.image_paths)) if i not in self.deleted_indices]
         if self.current_index < len(visible_indices) - 1:
             self.current_index += 1
             self.update_preview()
@@ -110,7 +134,7 @@ class ImageToPdfEditorWindow(QWidget):
             self.update_preview()
 
     def rotate_image(self, angle_delta):
-        visible_indices = [i for i in range(len(self.images)) if i not in self.deleted_indices]
+        visible_indices = [i for i in range(len(self.image_paths)) if i not in self.deleted_indices]
         if not visible_indices:
             return
         index = visible_indices[self.current_index]
@@ -118,7 +142,7 @@ class ImageToPdfEditorWindow(QWidget):
         self.update_preview()
 
     def delete_image(self):
-        visible_indices = [i for i in range(len(self.images)) if i not in self.deleted_indices]
+        visible_indices = [i for i in range(len(self.image_paths)) if i not in self.deleted_indices]
         if not visible_indices:
             return
         index = visible_indices[self.current_index]
@@ -132,23 +156,15 @@ class ImageToPdfEditorWindow(QWidget):
         if not output_path:
             return
 
-        visible_indices = [i for i in range(len(self.images)) if i not in self.deleted_indices]
+        visible_indices = [i for i in range(len(self.image_paths)) if i not in self.deleted_indices]
         if not visible_indices:
             QMessageBox.warning(self, "Внимание", "Нет изображений для сохранения.")
             return
 
-        processed_images = []
-        for i in visible_indices:
-            img = self.images[i]
-            angle = self.rotation_angles.get(str(i), 0)
-            if angle != 0:
-                img = img.rotate(angle, expand=True)
-            processed_images.append(img.convert("RGB"))
+        pages = [(self.image_paths[i], self.rotation_angles.get(str(i), 0)) for i in visible_indices]
 
         try:
-            processed_images[0].save(
-                output_path, save_all=True, append_images=processed_images[1:], format="PDF"
-            )
+            merge_images_to_pdf(pages, output_path)
             self.save_state()
             QMessageBox.information(self, "Успех", "Файл PDF успешно сохранён.")
             self.back_callback()
@@ -1,21 +1,37 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog,
-    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
-    QProgressBar, QHBoxLayout, QComboBox, QCheckBox
+    QProgressBar, QHBoxLayout
 )
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap
-from fpdf import FPDF
 import os
 
+from gui.job_table import JobTableModel, JobTableView, Column, format_mb, format_dimensions
+from gui.scanner import FileScanner
+from gui.workers import ConversionWorker, get_thread_pool
+from converter.probe import probe_files
+from converter.image_to_pdf import convert_image_to_pdf, IMAGE_TO_PDF_EXTENSIONS
+
 from gui.image_pdf_editor_window import ImageToPdfEditorWindow
 
 
+def convert_and_measure(file_path, page_format, target_dpi):
+    """
+    Конвертирует и возвращает (путь к PDF, экономия от уменьшения до
+    target_dpi в байтах или None, если PDF взят из кэша).
+    """
+    saved = {}
+    output_path = convert_image_to_pdf(file_path, page_format, target_dpi,
+                                       saved_callback=lambda size: saved.update(size=size))
+    return output_path, saved.get("size")
+
+
 class ImageToPdfWindow(QWidget):
     def __init__(self, back_callback):
         super().__init__()
         self.back_callback = back_callback
-        self.selected_files = []
+        self.running_jobs = set()
+        self.scanners = set()
+        self.thread_pool = get_thread_pool()
 
         self.setStyleSheet("font-size: 14px;")
         self.setWindowTitle("Изображения → PDF")
@@ -35,24 +51,21 @@ class ImageToPdfWindow(QWidget):
         self.progress_overall.setValue(0)
         layout.addWidget(self.progress_overall)
 
-        self.table = QTableWidget(0, 8)
-        self.table.setHorizontalHeaderLabels([
-            "Выбрать", "Файл", "Входной размер", "Формат", "Удалить",
-            "Статус", "Конвертировать", "Редактировать"
-        ])
-
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # Выбрать
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Файл (уменьшен)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.Stretch)
-        header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(7, QHeaderView.ResizeToContents)
-
-        self.table.setSelectionMode(QAbstractItemView.NoSelection)
-        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.model = JobTableModel([
+            Column("selected", "Выбрать", kind="check", width=80),
+            Column("name", "Файл", width=200),
+            Column("input_size", "Входной размер", formatter=format_mb, width=130),
+            Column("dimensions", "Размеры", formatter=format_dimensions, width=110),
+            Column("page_format", "Формат", kind="choice", choices=["A4", "A3", "A5"], width=90),
+            Column("target_dpi", "DPI на странице", kind="choice", choices=["auto", "150", "300"], width=130),
+            Column("output_size", "Выходной размер", formatter=format_mb, width=130),
+            Column("saved_size", "Экономия от DPI", formatter=format_mb, width=130),
+            Column("delete", "Удалить", kind="button", callback=self.remove_file, width=90),
+            Column("progress", "Статус", kind="progress", stretch=True),
+            Column("convert", "Конвертировать", kind="button", callback=self.convert_single, width=130),
+            Column("edit", "Редактировать", kind="button", callback=self.open_editor, width=130),
+        ], self)
+        self.table = JobTableView(self.model)
         layout.addWidget(self.table)
 
         button_layout = QHBoxLayout()
@@ -61,6 +74,10 @@ class ImageToPdfWindow(QWidget):
         add_button.clicked.connect(self.add_images)
         button_layout.addWidget(add_button)
 
+        add_folder_button = QPushButton("Добавить папку")
+        add_folder_button.clicked.connect(self.add_folder)
+        button_layout.addWidget(add_folder_button)
+
         delete_all_button = QPushButton("Удалить все")
         delete_all_button.clicked.connect(self.clear_all)
         button_layout.addWidget(delete_all_button)
@@ -86,116 +103,104 @@ class ImageToPdfWindow(QWidget):
             self, "Выберите изображения", "",
             "Изображения (*.png *.jpg *.jpeg *.bmp *.gif)"
         )
-        for file_path in files:
-            if file_path not in self.selected_files and len(self.selected_files) < 50:
-                self.selected_files.append(file_path)
-                self.add_row(file_path)
-
-    def add_row(self, file_path):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        checkbox = QCheckBox()
-        self.table.setCellWidget(row, 0, checkbox)
-
-        file_name = os.path.basename(file_path)
-        self.table.setItem(row, 1, QTableWidgetItem(file_name))
-
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        self.table.setItem(row, 2, QTableWidgetItem(f"{file_size_mb:.2f} MB"))
-
-        size_combo = QComboBox()
-        size_combo.addItems(["A4", "A3", "A5"])
-        self.table.setCellWidget(row, 3, size_combo)
-
-        delete_btn = QPushButton("Удалить")
-        delete_btn.clicked.connect(lambda _, r=row: self.remove_row(r))
-        self.table.setCellWidget(row, 4, delete_btn)
+        self.start_scan(files)
+
+    def make_job(self, file_path):
+        return {
+            "selected": False,
+            "page_format": "A4",
+            "target_dpi": "auto",
+            "output_size": None,
+            "saved_size": None
+        }
+
+    def remove_file(self, file_path):
+        self.model.remove_path(file_path)
+        self.update_progress_bar()
 
-        progress = QProgressBar()
-        progress.setValue(0)
-        progress.setAlignment(Qt.AlignCenter)
-        self.table.setCellWidget(row, 5, progress)
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите папку")
+        if folder:
+            self.start_scan([folder])
 
-        convert_btn = QPushButton("Конвертировать")
-        convert_btn.clicked.connect(lambda _, r=row: self.convert_single(r))
-        self.table.setCellWidget(row, 6, convert_btn)
+    def start_scan(self, paths):
+        if not paths:
+            return
+        # Обход папок и чтение размеров идут в фоне, строки добавляются пачками
+        scanner = FileScanner(paths, IMAGE_TO_PDF_EXTENSIONS)
+        scanner.signals.batch.connect(self.on_scan_batch)
+        scanner.signals.finished.connect(lambda _, s=scanner: self.scanners.discard(s))
+        self.scanners.add(scanner)
+        self.thread_pool.start(scanner)
+
+    def on_scan_batch(self, scanner, entries):
+        # Пачка могла встать в очередь до «Удалить все»
+        if scanner.cancelled:
+            return
+        self.model.add_files(entries, self.make_job)
+        self.update_progress_bar()
+        self.start_probe([path for path, _ in entries])
 
-        edit_btn = QPushButton("Редактировать")
-        edit_btn.clicked.connect(lambda _, r=row: self.open_editor(r))
-        self.table.setCellWidget(row, 7, edit_btn)
+    def start_probe(self, paths):
+        # Сведения о файлах читаются из заголовков в фоне, без декодирования
+        worker = ConversionWorker("probe", probe_files, paths)
+        worker.signals.finished.connect(self.on_probe_finished)
+        self.thread_pool.start(worker)
 
-    def remove_row(self, row):
-        if 0 <= row < len(self.selected_files):
-            self.selected_files.pop(row)
-            self.table.removeRow(row)
-            self.update_progress_bar()
+    def on_probe_finished(self, _, results):
+        self.model.update_jobs(results)
 
     def clear_all(self):
-        self.table.setRowCount(0)
-        self.selected_files.clear()
+        for scanner in self.scanners:
+            scanner.cancel()
+        self.scanners.clear()
+        self.model.clear()
         self.progress_overall.setValue(0)
 
     def update_progress_bar(self):
-        total = self.table.rowCount()
-        if total == 0:
-            self.progress_overall.setValue(0)
-            return
-
-        completed = sum(
-            1 for row in range(total)
-            if isinstance(self.table.cellWidget(row, 5), QProgressBar)
-            and self.table.cellWidget(row, 5).value() == 100
-        )
-        self.progress_overall.setValue(int((completed / total) * 100))
+        self.progress_overall.setValue(self.model.completed_percent())
 
-    def convert_single(self, row):
-        if row >= len(self.selected_files):
+    def convert_single(self, file_path):
+        job = self.model.job(file_path)
+        if job is None or file_path in self.running_jobs:
             return
-
-        file_path = self.selected_files[row]
-        progress_bar = self.table.cellWidget(row, 5)
-        size_combo = self.table.cellWidget(row, 3)
-        page_format = size_combo.currentText() if size_combo else "A4"
+        page_format = job.get("page_format") or "A4"
 
         try:
-            progress_bar.setValue(10)
-
-            output_path = os.path.splitext(file_path)[0] + "_converted.pdf"
-            pdf = FPDF(unit="pt", format=page_format)
-            pdf.add_page()
-
-            img = QPixmap(file_path)
-            if img.isNull():
-                raise Exception("Невозможно загрузить изображение")
-
-            max_width = pdf.w - 60
-            img_ratio = img.width() / img.height()
-            height = max_width / img_ratio
+            target_dpi = None if job["target_dpi"] == "auto" else int(job["target_dpi"])
+            worker = ConversionWorker(file_path, convert_and_measure, file_path, page_format, target_dpi)
 
-            pdf.image(file_path, x=30, y=30, w=max_width, h=height)
-            pdf.output(output_path)
+        except Exception as e:
+            self.on_conversion_failed(file_path, str(e))
+            return
 
-            progress_bar.setValue(100)
+        self.model.update_job(file_path, progress=10, error=None)
+        worker.signals.finished.connect(self.on_conversion_finished)
+        worker.signals.failed.connect(self.on_conversion_failed)
+        self.running_jobs.add(file_path)
+        self.thread_pool.start(worker)
 
-        except Exception as e:
-            error_label = QLabel("Ошибка: " + str(e))
-            error_label.setStyleSheet("color: red;")
-            self.table.setCellWidget(row, 5, error_label)
-            print(f"Ошибка при конвертации: {e}")
+    def on_conversion_finished(self, file_path, result):
+        self.running_jobs.discard(file_path)
+        if self.model.job(file_path) is None:
+            return
+        # Экономия — на сколько байт меньше картинка в PDF благодаря уменьшению до target_dpi
+        output_path, saved_size = result
+        output_size = os.path.getsize(output_path) if os.path.exists(output_path) else None
+        self.model.update_job(file_path, progress=100, output_size=output_size, saved_size=saved_size)
+        self.update_progress_bar()
 
+    def on_conversion_failed(self, file_path, message):
+        self.running_jobs.discard(file_path)
+        self.model.update_job(file_path, error=message)
         self.update_progress_bar()
 
     def convert_all(self):
-        for row in range(self.table.rowCount()):
-            self.convert_single(row)
+        for file_path in self.model.paths():
+            self.convert_single(file_path)
 
     def convert_selected_to_single_pdf(self):
-        selected_paths = [
-            self.selected_files[row]
-            for row in range(self.table.rowCount())
-            if isinstance(self.table.cellWidget(row, 0), QCheckBox) and self.table.cellWidget(row, 0).isChecked()
-        ]
+        selected_paths = [job["path"] for job in self.model.jobs if job.get("selected")]
 
         if not selected_paths:
             return
@@ -204,8 +209,7 @@ class ImageToPdfWindow(QWidget):
         editor.show()
         self.hide()
 
-    def open_editor(self, row):
-        if row < len(self.selected_files):
-            editor = ImageToPdfEditorWindow([self.selected_files[row]], self.show)
-            editor.show()
-            self.hide()
+    def open_editor(self, file_path):
+        editor = ImageToPdfEditorWindow([file_path], self.show)
+        editor.show()
+        self.hide()
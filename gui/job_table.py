@@ -0,0 +1,462 @@
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLineEdit, QTableView, QHeaderView, QAbstractItemView,
+    QStyledItemDelegate, QStyleOptionProgressBar, QStyleOptionButton, QStyle,
+    QApplication, QComboBox
+)
+from PySide6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QEvent, QTimer
+)
+from PySide6.QtGui import QColor
+import os
+
+# Дополнительные роли модели
+SortRole = Qt.ItemDataRole.UserRole
+PathRole = Qt.ItemDataRole.UserRole + 1
+ChoicesRole = Qt.ItemDataRole.UserRole + 2
+ErrorRole = Qt.ItemDataRole.UserRole + 3
+DetailsRole = Qt.ItemDataRole.UserRole + 4
+
+
+def format_kb(size):
+    return "—" if size is None else f"{size / 1024:.1f} KB"
+
+
+def format_mb(size):
+    return "—" if size is None else f"{size / (1024 * 1024):.2f} MB"
+
+
+def format_kb_int(size):
+    return "—" if size is None else f"{size // 1024} КБ"
+
+
+def format_dimensions(size):
+    return "—" if not size else f"{size[0]}×{size[1]}"
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "—"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def format_count(value):
+    return "—" if value is None else str(value)
+
+
+class Column:
+    """
+    Описание столбца таблицы задач.
+    kind: text — значение из задачи, choice — выпадающий список,
+    check — флажок, progress — прогресс/ошибка, button — кнопка действия.
+    """
+
+    def __init__(self, key, title, kind="text", formatter=None, choices=None,
+                 callback=None, width=None, stretch=False):
+        self.key = key
+        self.title = title
+        self.kind = kind
+        self.formatter = formatter
+        self.choices = choices
+        self.callback = callback
+        self.width = width
+        self.stretch = stretch
+
+
+class JobTableModel(QAbstractTableModel):
+    """
+    Модель списка файлов окна конвертации. Строка — словарь задачи
+    (path, name, выбранные параметры, progress, error, размеры). Никаких
+    виджетов на строку не создаётся, поэтому таблица держит сотни тысяч файлов.
+    """
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.jobs = []
+        self.rows_by_path = {}
+
+    # --- интерфейс QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.jobs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section].title
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        job = self.jobs[index.row()]
+        column = self.columns[index.column()]
+
+        if role == PathRole:
+            return job["path"]
+        if role == ErrorRole:
+            return job.get("error")
+        if role == DetailsRole:
+            return job.get(column.key + "_details")
+        if role == ChoicesRole:
+            return column.choices if column.choices is not None else job.get(column.key + "_choices", [])
+
+        if role == SortRole:
+            return self.sort_value(job, column)
+
+        if column.kind == "check":
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return Qt.CheckState.Checked if job.get(column.key) else Qt.CheckState.Unchecked
+            return None
+
+        if column.kind == "button":
+            if role == Qt.ItemDataRole.DisplayRole:
+                return column.title
+            return None
+
+        value = job.get(column.key)
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if column.kind == "progress":
+                return value or 0
+            if column.formatter:
+                return column.formatter(value)
+            return "" if value is None else str(value)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if column.kind == "progress" and job.get("error"):
+                return job["error"]
+            if column.key == "name":
+                return job["path"]
+        return None
+
+    def sort_value(self, job, column):
+        value = job.get(column.key)
+        if column.kind == "check":
+            return int(bool(value))
+        if column.kind == "progress":
+            return -1 if job.get("error") else (value or 0)
+        if value is None:
+            return -1 if column.formatter else ""
+        if isinstance(value, tuple):
+            # Размеры сортируются по площади
+            return value[0] * value[1]
+        return value
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        job = self.jobs[index.row()]
+        column = self.columns[index.column()]
+        if column.kind == "check" and role == Qt.ItemDataRole.CheckStateRole:
+            job[column.key] = Qt.CheckState(value) == Qt.CheckState.Checked
+        elif column.kind == "choice" and role == Qt.ItemDataRole.EditRole:
+            job[column.key] = value
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled
+        if not index.isValid():
+            return flags
+        kind = self.columns[index.column()].kind
+        if kind == "choice":
+            flags |= Qt.ItemFlag.ItemIsEditable
+        elif kind == "check":
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        Сортировка списком Python по ключу: на сотнях тысяч строк это намного
+        быстрее, чем сравнение пар строк через data() в прокси-модели.
+        """
+        if column < 0 or column >= len(self.columns) or not self.jobs:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_rows = {id(job): row for row, job in enumerate(self.jobs)}
+        sort_column = self.columns[column]
+
+        def sort_key(job):
+            value = self.sort_value(job, sort_column)
+            # Числа и строки нельзя сравнивать между собой — разносим по группам
+            if isinstance(value, (int, float)):
+                return 0, value, ""
+            return 1, 0, str(value).lower()
+
+        self.jobs.sort(key=sort_key, reverse=order == Qt.SortOrder.DescendingOrder)
+        self.rows_by_path = {job["path"]: i for i, job in enumerate(self.jobs)}
+
+        new_rows = {old_rows[id(job)]: row for row, job in enumerate(self.jobs)}
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(new_rows[index.row()], index.column()) for index in old_indexes]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    # --- работа с задачами ---
+
+    def column_index(self, key):
+        for i, column in enumerate(self.columns):
+            if column.key == key:
+                return i
+        return -1
+
+    def add_jobs(self, jobs):
+        """
+        Добавляет задачи одной вставкой; файлы, которые уже есть в таблице, пропускаются.
+        """
+        new_jobs = []
+        for job in jobs:
+            if job["path"] in self.rows_by_path:
+                continue
+            self.rows_by_path[job["path"]] = len(self.jobs) + len(new_jobs)
+            new_jobs.append(job)
+        if not new_jobs:
+            return 0
+        first = len(self.jobs)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_jobs) - 1)
+        self.jobs.extend(new_jobs)
+        self.endInsertRows()
+        return len(new_jobs)
+
+    def add_files(self, entries, make_job):
+        """
+        entries — пары (путь, размер), которые присылает FileScanner;
+        остальные поля задачи окно заполняет в make_job(путь).
+        """
+        jobs = []
+        for path, size in entries:
+            if path in self.rows_by_path:
+                continue
+            job = {"path": path, "name": os.path.basename(path), "progress": 0, "error": None,
+                   "input_size": size}
+            job.update(make_job(path))
+            jobs.append(job)
+        return self.add_jobs(jobs)
+
+    def remove_path(self, path):
+        row = self.rows_by_path.get(path)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.jobs[row]
+        self.endRemoveRows()
+        self.rows_by_path = {job["path"]: i for i, job in enumerate(self.jobs)}
+
+    def clear(self):
+        self.beginResetModel()
+        self.jobs = []
+        self.rows_by_path = {}
+        self.endResetModel()
+
+    def job(self, path):
+        row = self.rows_by_path.get(path)
+        return None if row is None else self.jobs[row]
+
+    def paths(self):
+        return [job["path"] for job in self.jobs]
+
+    def update_job(self, path, **fields):
+        row = self.rows_by_path.get(path)
+        if row is None:
+            return
+        self.jobs[row].update(fields)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def update_jobs(self, updates):
+        """
+        updates — словарь {путь: поля}; все строки обновляются одним сигналом.
+        """
+        rows = []
+        for path, fields in updates.items():
+            row = self.rows_by_path.get(path)
+            if row is None or not fields:
+                continue
+            self.jobs[row].update(fields)
+            rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0),
+                                  self.index(max(rows), len(self.columns) - 1))
+
+    def set_for_all(self, key, get_value):
+        """
+        Меняет поле key во всех задачах: get_value(задача) возвращает новое
+        значение или None, если задачу менять не нужно.
+        """
+        if not self.jobs:
+            return
+        for job in self.jobs:
+            value = get_value(job)
+            if value is not None:
+                job[key] = value
+        column = self.column_index(key)
+        if column >= 0:
+            self.dataChanged.emit(self.index(0, column), self.index(len(self.jobs) - 1, column))
+
+    def completed_percent(self):
+        if not self.jobs:
+            return 0
+        completed = sum(1 for job in self.jobs if job.get("progress") == 100 and not job.get("error"))
+        return int((completed / len(self.jobs)) * 100)
+
+
+class ChoiceDelegate(QStyledItemDelegate):
+    """
+    Выпадающий список создаётся только для редактируемой ячейки.
+    """
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(index.data(ChoicesRole) or [])
+        editor.activated.connect(lambda _: self.commit_and_close(editor))
+        QTimer.singleShot(0, editor.showPopup)
+        return editor
+
+    def commit_and_close(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor)
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """
+    Рисует полосу прогресса или текст ошибки; отдельного виджета на строку нет.
+    """
+
+    def paint(self, painter, option, index):
+        error = index.data(ErrorRole)
+        if error:
+            painter.save()
+            painter.setPen(QColor("red"))
+            text = option.fontMetrics.elidedText(
+                "Ошибка: " + error.splitlines()[0] if error.strip() else "Ошибка",
+                Qt.TextElideMode.ElideRight, option.rect.width() - 6
+            )
+            painter.drawText(option.rect.adjusted(3, 0, -3, 0),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+            painter.restore()
+            return
+
+        value = index.data(Qt.ItemDataRole.DisplayRole) or 0
+        details = index.data(DetailsRole)
+
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 3, -2, -3)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = int(value)
+        bar.text = f"{int(value)}% · {details}" if details else f"{int(value)}%"
+        bar.textVisible = True
+        bar.textAlignment = Qt.AlignmentFlag.AlignCenter
+        bar.state = option.state
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ProgressBar, bar, painter, option.widget)
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Рисует кнопку и по щелчку вызывает callback(путь к файлу строки).
+    """
+
+    def __init__(self, callback, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = index.data(Qt.ItemDataRole.DisplayRole)
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            if option.rect.contains(event.position().toPoint()):
+                # Вызов откладывается: обработчик может удалить эту же строку
+                path = index.data(PathRole)
+                QTimer.singleShot(0, lambda: self.callback(path))
+                return True
+        return False
+
+
+class JobFilterProxyModel(QSortFilterProxyModel):
+    """
+    Прокси только фильтрует, а сортировку передаёт исходной модели.
+    """
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+class JobTableView(QWidget):
+    """
+    Поле фильтра по имени файла и таблица задач с сортировкой по щелчку на заголовке.
+    """
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+
+        self.proxy = JobFilterProxyModel(self)
+        self.proxy.setSourceModel(model)
+        self.proxy.setFilterKeyColumn(max(0, model.column_index("name")))
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Фильтр по имени файла")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.proxy.setFilterFixedString)
+        layout.addWidget(self.filter_edit)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        header = self.view.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSectionsClickable(True)
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.proxy.sort)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.view.setEditTriggers(
+            QAbstractItemView.EditTrigger.CurrentChanged
+            | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.DoubleClicked
+        )
+        self.view.setWordWrap(False)
+        # Одинаковая высота строк: представлению не нужно измерять каждую строку
+        vertical_header = self.view.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(30)
+        vertical_header.hide()
+        layout.addWidget(self.view)
+
+        self.delegates = []
+        for i, column in enumerate(model.columns):
+            if column.kind == "choice":
+                delegate = ChoiceDelegate(self.view)
+            elif column.kind == "progress":
+                delegate = ProgressDelegate(self.view)
+            elif column.kind == "button":
+                delegate = ButtonDelegate(column.callback, self.view)
+            else:
+                delegate = None
+            if delegate is not None:
+                self.view.setItemDelegateForColumn(i, delegate)
+                self.delegates.append(delegate)
+
+            if column.stretch:
+                header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
+            elif column.width:
+                self.view.setColumnWidth(i, column.width)
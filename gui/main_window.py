@@ -1,5 +1,6 @@
 import os
 import json
+import multiprocessing
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel,
     QStackedWidget, QMenuBar, QMenu, QMessageBox, QHBoxLayout, QSizePolicy
@@ -304,6 +305,8 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Нужно для пула процессов в собранном .exe
+    multiprocessing.freeze_support()
     app = QApplication([])
     window = MainWindow()
     window.showMaximized()
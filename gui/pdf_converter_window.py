@@ -1,19 +1,24 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog,
-    QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView,
-    QAbstractItemView, QProgressBar, QComboBox
+    QHBoxLayout, QProgressBar, QComboBox
 )
 from PySide6.QtCore import Qt
 import os
-from pdf2docx import Converter as DocxConverter
-import pdfplumber
+
+from gui.job_table import JobTableModel, JobTableView, Column, format_kb_int, format_count
+from gui.scanner import FileScanner
+from gui.workers import ConversionWorker, get_thread_pool
+from converter.probe import probe_files
+from converter.pdf import convert_pdf
 
 
 class PdfConverterWindow(QWidget):
     def __init__(self, back_callback):
         super().__init__()
         self.back_callback = back_callback
-        self.selected_files = []
+        self.running_jobs = set()
+        self.scanners = set()
+        self.thread_pool = get_thread_pool()
 
         self.setStyleSheet("font-size: 14px;")
         self.setWindowTitle("PDF → DOCX / TXT")
@@ -42,15 +47,17 @@ class PdfConverterWindow(QWidget):
         self.progress_overall.setValue(0)
         layout.addWidget(self.progress_overall)
 
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
-            "Файл", "Формат", "Входной размер", "Выходной размер",
-            "Удалить", "Статус", "Конвертировать"
-        ])
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
-        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.model = JobTableModel([
+            Column("name", "Файл", stretch=True),
+            Column("to_format", "Формат", kind="choice", choices=['docx', 'txt'], width=90),
+            Column("input_size", "Входной размер", formatter=format_kb_int, width=120),
+            Column("pages", "Страниц", formatter=format_count, width=80),
+            Column("output_size", "Выходной размер", formatter=format_kb_int, width=130),
+            Column("delete", "Удалить", kind="button", callback=self.remove_file, width=90),
+            Column("progress", "Статус", kind="progress", stretch=True),
+            Column("convert", "Конвертировать", kind="button", callback=self.convert_single, width=130),
+        ], self)
+        self.table = JobTableView(self.model)
         layout.addWidget(self.table)
 
         button_layout = QHBoxLayout()
@@ -59,6 +66,10 @@ class PdfConverterWindow(QWidget):
         add_button.clicked.connect(self.add_pdf_files)
         button_layout.addWidget(add_button)
 
+        add_folder_button = QPushButton("Добавить папку")
+        add_folder_button.clicked.connect(self.add_folder)
+        button_layout.addWidget(add_folder_button)
+
         delete_all_button = QPushButton("Удалить все")
         delete_all_button.clicked.connect(self.clear_all)
         button_layout.addWidget(delete_all_button)
@@ -76,112 +87,99 @@ class PdfConverterWindow(QWidget):
         self.setLayout(layout)
 
     def set_all_formats(self, selected_format):
-        for row in range(self.table.rowCount()):
-            combo = self.table.cellWidget(row, 1)
-            if isinstance(combo, QComboBox):
-                combo.setCurrentText(selected_format)
+        self.model.set_for_all("to_format", lambda job: selected_format)
 
     def add_pdf_files(self):
         files, _ = QFileDialog.getOpenFileNames(self, "Выберите PDF-файлы", "",
                                                 "PDF-файлы (*.pdf)")
-        for file_path in files:
-            if file_path not in self.selected_files and len(self.selected_files) < 50:
-                self.selected_files.append(file_path)
-                self.add_row(file_path)
-
-    def clear_all(self):
-        self.table.setRowCount(0)
-        self.selected_files.clear()
-        self.progress_overall.setValue(0)
+        self.start_scan(files)
 
-    def add_row(self, file_path):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите папку")
+        if folder:
+            self.start_scan([folder])
 
-        file_name = os.path.basename(file_path)
-        self.table.setItem(row, 0, QTableWidgetItem(file_name))
-
-        combo = QComboBox()
-        combo.addItems(['docx', 'txt'])
-        combo.setCurrentText(self.format_combo.currentText())
-        self.table.setCellWidget(row, 1, combo)
+    def start_scan(self, paths):
+        if not paths:
+            return
+        # Обход папок и чтение размеров идут в фоне, строки добавляются пачками
+        scanner = FileScanner(paths, [".pdf"])
+        scanner.signals.batch.connect(self.on_scan_batch)
+        scanner.signals.finished.connect(lambda _, s=scanner: self.scanners.discard(s))
+        self.scanners.add(scanner)
+        self.thread_pool.start(scanner)
+
+    def on_scan_batch(self, scanner, entries):
+        # Пачка могла встать в очередь до «Удалить все»
+        if scanner.cancelled:
+            return
+        self.model.add_files(entries, self.make_job)
+        self.update_progress_bar()
+        self.start_probe([path for path, _ in entries])
 
-        input_size_kb = os.path.getsize(file_path) // 1024
-        self.table.setItem(row, 2, QTableWidgetItem(f"{input_size_kb} КБ"))
-        self.table.setItem(row, 3, QTableWidgetItem("—"))
+    def start_probe(self, paths):
+        # Сведения о файлах читаются из заголовков в фоне, без декодирования
+        worker = ConversionWorker("probe", probe_files, paths)
+        worker.signals.finished.connect(self.on_probe_finished)
+        self.thread_pool.start(worker)
 
-        delete_btn = QPushButton("Удалить")
-        delete_btn.clicked.connect(lambda _, r=row: self.remove_row(r))
-        self.table.setCellWidget(row, 4, delete_btn)
+    def on_probe_finished(self, _, results):
+        self.model.update_jobs(results)
 
-        progress = QProgressBar()
-        progress.setValue(0)
-        progress.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.table.setCellWidget(row, 5, progress)
+    def clear_all(self):
+        for scanner in self.scanners:
+            scanner.cancel()
+        self.scanners.clear()
+        self.model.clear()
+        self.progress_overall.setValue(0)
 
-        convert_btn = QPushButton("Конвертировать")
-        convert_btn.clicked.connect(lambda _, r=row: self.convert_single(r))
-        self.table.setCellWidget(row, 6, convert_btn)
+    def make_job(self, file_path):
+        return {
+            "to_format": self.format_combo.currentText(),
+            "output_size": None
+        }
 
-    def remove_row(self, row):
-        if 0 <= row < len(self.selected_files):
-            self.selected_files.pop(row)
-            self.table.removeRow(row)
-            self.update_progress_bar()
+    def remove_file(self, file_path):
+        self.model.remove_path(file_path)
+        self.update_progress_bar()
 
     def update_progress_bar(self):
-        total = self.table.rowCount()
-        if total == 0:
-            self.progress_overall.setValue(0)
-            return
+        self.progress_overall.setValue(self.model.completed_percent())
 
-        completed = 0
-        for row in range(total):
-            widget = self.table.cellWidget(row, 5)
-            if isinstance(widget, QProgressBar) and widget.value() == 100:
-                completed += 1
-        self.progress_overall.setValue(int((completed / total) * 100))
-
-    def convert_single(self, row):
-        if row >= len(self.selected_files):
+    def convert_single(self, file_path):
+        job = self.model.job(file_path)
+        if job is None or file_path in self.running_jobs:
             return
-
-        file_path = self.selected_files[row]
-        combo = self.table.cellWidget(row, 1)
-        to_format = combo.currentText().lower()
-        progress_bar = self.table.cellWidget(row, 5)
+        to_format = job["to_format"].lower()
 
         try:
-            progress_bar.setValue(10)
+            worker = ConversionWorker(file_path, convert_pdf, file_path, to_format)
 
-            output_path = os.path.splitext(file_path)[0] + f"_converted.{to_format}"
-
-            if to_format == "docx":
-                converter = DocxConverter(file_path)
-                converter.convert(output_path, start=0, end=None)
-                converter.close()
-            elif to_format == "txt":
-                with pdfplumber.open(file_path) as pdf:
-                    text = "\n".join(page.extract_text() or '' for page in pdf.pages)
-                    with open(output_path, "w", encoding="utf-8") as f:
-                        f.write(text)
+        except Exception as e:
+            self.on_conversion_failed(file_path, str(e))
+            return
 
-            progress_bar.setValue(100)
+        self.model.update_job(file_path, progress=10, error=None)
+        worker.signals.finished.connect(self.on_conversion_finished)
+        worker.signals.failed.connect(self.on_conversion_failed)
+        self.running_jobs.add(file_path)
+        self.thread_pool.start(worker)
 
-            if os.path.exists(output_path):
-                output_size_kb = os.path.getsize(output_path) // 1024
-                self.table.setItem(row, 3, QTableWidgetItem(f"{output_size_kb} КБ"))
+    def on_conversion_finished(self, file_path, output_path):
+        self.running_jobs.discard(file_path)
+        if os.path.exists(output_path):
+            self.model.update_job(file_path, output_size=os.path.getsize(output_path))
 
-            print(f"Успешно сконвертировано: {output_path}")
+        print(f"Успешно сконвертировано: {output_path}")
 
-        except Exception as e:
-            error_label = QLabel("Ошибка: " + str(e))
-            error_label.setStyleSheet("color: red;")
-            self.table.setCellWidget(row, 5, error_label)
-            print(f"Ошибка при конвертации: {e}")
+        self.model.update_job(file_path, progress=100)
+        self.update_progress_bar()
 
+    def on_conversion_failed(self, file_path, message):
+        self.running_jobs.discard(file_path)
+        self.model.update_job(file_path, error=message)
         self.update_progress_bar()
 
     def convert_all(self):
-        for row in range(self.table.rowCount()):
-            self.convert_single(row)
+        for file_path in self.model.paths():
+            self.convert_single(file_path)
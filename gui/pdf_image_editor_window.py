@@ -2,14 +2,86 @@ import os
 import json
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QHBoxLayout,
-    QGraphicsView, QGraphicsScene, QMessageBox
+    QGraphicsView, QGraphicsScene, QMessageBox, QListView, QAbstractItemView
 )
-from PySide6.QtGui import QPixmap, QImage, QTransform
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QPixmap, QImage, QTransform, QColor
+from PySide6.QtCore import Qt, QThreadPool, QAbstractListModel, QModelIndex, QSize, QPoint
 from PySide6.QtGui import QCloseEvent
-from pdf2image import convert_from_path
+from collections import OrderedDict
 from PIL import ImageQt
 
+from gui.workers import ConversionWorker
+from converter.pdf_to_image import get_page_count, render_page, render_thumbnail, THUMBNAIL_DPI
+
+# Разрешение предпросмотра: примерно как у экрана, а не 200 DPI для печати
+PREVIEW_DPI = 96
+# Сколько страниц до и после текущей рисуется заранее
+PREFETCH_PAGES = 2
+# Сколько отрисованных страниц держится в памяти
+PAGE_CACHE_SIZE = 12
+# Размер миниатюры в ленте и сколько миниатюр держится в памяти
+THUMBNAIL_SIZE = QSize(90, 120)
+THUMBNAIL_CACHE_SIZE = 400
+
+
+def render_preview(pdf_path, page_num, dpi):
+    image = render_page(pdf_path, page_num, dpi)
+    return ImageQt.ImageQt(image.convert("RGB")).copy()
+
+
+class PageThumbnailModel(QAbstractListModel):
+    """
+    Лента миниатюр оставшихся страниц. Миниатюра заказывается, только когда
+    представление впервые просит её нарисовать, поэтому для тысячи страниц
+    рисуются лишь те, что видны на экране.
+    """
+
+    def __init__(self, pages, rotation_angles, request_thumbnail, parent=None):
+        super().__init__(parent)
+        self.pages = pages
+        self.rotation_angles = rotation_angles
+        self.request_thumbnail = request_thumbnail
+        self.thumbnails = OrderedDict()
+        self.placeholder = QPixmap(THUMBNAIL_SIZE)
+        self.placeholder.fill(QColor("#e0e0e0"))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.pages)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        page_num = self.pages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(page_num + 1)
+        if role == Qt.ItemDataRole.DecorationRole:
+            pixmap = self.thumbnails.get(page_num)
+            if pixmap is None:
+                self.request_thumbnail(page_num)
+                return self.placeholder
+            self.thumbnails.move_to_end(page_num)
+            angle = self.rotation_angles.get(str(page_num), 0)
+            if angle != 0:
+                pixmap = pixmap.transformed(QTransform().rotate(-angle))
+            return pixmap
+        return None
+
+    def set_thumbnail(self, page_num, pixmap):
+        self.thumbnails[page_num] = pixmap
+        while len(self.thumbnails) > THUMBNAIL_CACHE_SIZE:
+            self.thumbnails.popitem(last=False)
+        self.refresh_page(page_num)
+
+    def refresh_page(self, page_num):
+        if page_num in self.pages:
+            index = self.index(self.pages.index(page_num))
+            self.dataChanged.emit(index, index)
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.pages[row]
+        self.endRemoveRows()
+
 
 class PdfImageEditorWindow(QDialog):
     def __init__(self, pdf_path, back_callback=None):
@@ -18,10 +90,19 @@ class PdfImageEditorWindow(QDialog):
         self.back_callback = back_callback
 
         self.setWindowTitle("Редактирование PDF перед конвертацией")
-        self.resize(800, 600)
+        self.resize(900, 750)
 
-        self.all_images = []
+        self.page_count = 0
         self.page_indices = []
+        # Страницы рисуются в фоне: готовые лежат в LRU, заказанные — в pending
+        self.page_cache = OrderedDict()
+        self.pending = {}
+        self.render_pool = QThreadPool(self)
+        self.render_pool.setMaxThreadCount(2)
+        self.thumbnail_pending = {}
+        self.thumbnail_pool = QThreadPool(self)
+        self.thumbnail_pool.setMaxThreadCount(2)
+        self.rendering_stopped = False
         self.current_index = 0
         self.deleted_pages = set()
         self.rotation_angles = {}
@@ -44,6 +125,26 @@ class PdfImageEditorWindow(QDialog):
         self.view.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.view)
 
+        # Лента миниатюр: клик по миниатюре открывает страницу
+        self.thumbnail_model = PageThumbnailModel(
+            self.page_indices, self.rotation_angles, self.request_thumbnail, self
+        )
+        self.thumbnail_view = QListView()
+        self.thumbnail_view.setModel(self.thumbnail_model)
+        self.thumbnail_view.setViewMode(QListView.ViewMode.IconMode)
+        self.thumbnail_view.setFlow(QListView.Flow.LeftToRight)
+        self.thumbnail_view.setWrapping(False)
+        self.thumbnail_view.setMovement(QListView.Movement.Static)
+        self.thumbnail_view.setUniformItemSizes(True)
+        self.thumbnail_view.setIconSize(THUMBNAIL_SIZE)
+        self.thumbnail_view.setSpacing(4)
+        self.thumbnail_view.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.thumbnail_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.thumbnail_view.setFixedHeight(THUMBNAIL_SIZE.height() + 50)
+        self.thumbnail_view.clicked.connect(self.on_thumbnail_clicked)
+        self.thumbnail_view.horizontalScrollBar().valueChanged.connect(self.cancel_hidden_thumbnails)
+        layout.addWidget(self.thumbnail_view)
+
         nav_layout = QHBoxLayout()
         prev_btn = QPushButton("← Предыдущая")
         prev_btn.clicked.connect(self.prev_page)
@@ -83,30 +184,127 @@ class PdfImageEditorWindow(QDialog):
 
     def load_images(self):
         try:
-            self.all_images = convert_from_path(self.pdf_path)
-            self.page_indices = [i for i in range(len(self.all_images)) if i not in self.deleted_pages]
+            self.page_count = get_page_count(self.pdf_path)
+            self.page_indices = [i for i in range(self.page_count) if i not in self.deleted_pages]
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить PDF:\n{e}")
 
+    def request_pages(self):
+        """
+        Заказывает текущую страницу и соседние; задания для страниц, которые
+        ушли из окна предзагрузки и ещё не начали рисоваться, снимаются.
+        """
+        if self.rendering_stopped:
+            return
+        first = max(0, self.current_index - PREFETCH_PAGES)
+        wanted = self.page_indices[first:self.current_index + PREFETCH_PAGES + 1]
+        current = self.page_indices[self.current_index]
+        wanted.sort(key=lambda page: abs(page - current))
+
+        for page_num, worker in list(self.pending.items()):
+            if page_num not in wanted and self.render_pool.tryTake(worker):
+                del self.pending[page_num]
+
+        for page_num in wanted:
+            if page_num in self.page_cache or page_num in self.pending:
+                continue
+            worker = ConversionWorker(str(page_num), render_preview, self.pdf_path, page_num, PREVIEW_DPI)
+            worker.setAutoDelete(False)
+            worker.signals.finished.connect(self.on_page_rendered)
+            worker.signals.failed.connect(self.on_page_failed)
+            self.pending[page_num] = worker
+            self.render_pool.start(worker, 1 if page_num == current else 0)
+
+    def on_page_rendered(self, key, image):
+        page_num = int(key)
+        self.pending.pop(page_num, None)
+        self.page_cache[page_num] = image
+        self.page_cache.move_to_end(page_num)
+        while len(self.page_cache) > PAGE_CACHE_SIZE:
+            self.page_cache.popitem(last=False)
+        if self.page_indices and self.page_indices[self.current_index] == page_num:
+            self.update_preview()
+
+    def on_page_failed(self, key, message):
+        page_num = int(key)
+        self.pending.pop(page_num, None)
+        if self.page_indices and self.page_indices[self.current_index] == page_num:
+            self.scene.clear()
+            self.page_label.setText(f"Не удалось отрисовать страницу:\n{message}")
+
+    def request_thumbnail(self, page_num):
+        if self.rendering_stopped or page_num in self.thumbnail_pending:
+            return
+        worker = ConversionWorker(str(page_num), render_thumbnail, self.pdf_path, page_num, THUMBNAIL_DPI)
+        worker.setAutoDelete(False)
+        worker.signals.finished.connect(self.on_thumbnail_rendered)
+        worker.signals.failed.connect(self.on_thumbnail_failed)
+        self.thumbnail_pending[page_num] = worker
+        self.thumbnail_pool.start(worker)
+
+    def on_thumbnail_rendered(self, key, data):
+        page_num = int(key)
+        self.thumbnail_pending.pop(page_num, None)
+        image = QImage.fromData(data)
+        pixmap = QPixmap.fromImage(image.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.thumbnail_model.set_thumbnail(page_num, pixmap)
+
+    def on_thumbnail_failed(self, key, message):
+        self.thumbnail_pending.pop(int(key), None)
+
+    def visible_thumbnail_rows(self):
+        viewport = self.thumbnail_view.viewport()
+        middle = viewport.height() // 2
+        first = self.thumbnail_view.indexAt(QPoint(1, middle))
+        last = self.thumbnail_view.indexAt(QPoint(viewport.width() - 2, middle))
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else len(self.page_indices) - 1
+        return first_row, last_row
+
+    def cancel_hidden_thumbnails(self):
+        """
+        Снимает с очереди миниатюры, которые прокрутили, не дождавшись отрисовки.
+        """
+        first_row, last_row = self.visible_thumbnail_rows()
+        visible = set(self.page_indices[max(0, first_row - 2):last_row + 3])
+        for page_num, worker in list(self.thumbnail_pending.items()):
+            if page_num not in visible and self.thumbnail_pool.tryTake(worker):
+                del self.thumbnail_pending[page_num]
+
+    def on_thumbnail_clicked(self, index):
+        self.current_index = index.row()
+        self.update_preview()
+
     def update_preview(self):
         if not self.page_indices:
             self.page_label.setText("Все страницы удалены.")
             self.scene.clear()
             return
 
+        self.request_pages()
         page_num = self.page_indices[self.current_index]
-        image = self.all_images[page_num]
+        current = self.thumbnail_model.index(self.current_index)
+        self.thumbnail_view.setCurrentIndex(current)
+        self.thumbnail_view.scrollTo(current)
+        page_text = f"Страница {self.current_index + 1} из {len(self.page_indices)}"
+        image = self.page_cache.get(page_num)
+        if image is None:
+            self.scene.clear()
+            self.page_label.setText(page_text + " (загрузка...)")
+            return
+
+        self.page_cache.move_to_end(page_num)
+        pixmap = QPixmap.fromImage(image)
         angle = self.rotation_angles.get(str(page_num), 0)
         if angle != 0:
-            image = image.rotate(angle, expand=True)
-
-        qimage = ImageQt.ImageQt(image)
-        pixmap = QPixmap.fromImage(QImage(qimage))
+            # Как PIL.Image.rotate в конвертере: положительный угол — против часовой стрелки
+            pixmap = pixmap.transformed(QTransform().rotate(-angle))
 
         self.scene.clear()
         self.scene.addPixmap(pixmap)
+        self.scene.setSceneRect(self.scene.itemsBoundingRect())
         self.view.fitInView(self.scene.itemsBoundingRect(), Qt.KeepAspectRatio)
-        self.page_label.setText(f"Страница {self.current_index + 1} из {len(self.page_indices)}")
+        self.page_label.setText(page_text)
 
     def prev_page(self):
         if self.current_index > 0:
@@ -121,11 +319,13 @@ class PdfImageEditorWindow(QDialog):
     def rotate_left(self):
         page_num = self.page_indices[self.current_index]
         self.rotation_angles[str(page_num)] = (self.rotation_angles.get(str(page_num), 0) - 90) % 360
+        self.thumbnail_model.refresh_page(page_num)
         self.update_preview()
 
     def rotate_right(self):
         page_num = self.page_indices[self.current_index]
         self.rotation_angles[str(page_num)] = (self.rotation_angles.get(str(page_num), 0) + 90) % 360
+        self.thumbnail_model.refresh_page(page_num)
         self.update_preview()
 
     def delete_page(self):
@@ -134,7 +334,7 @@ class PdfImageEditorWindow(QDialog):
 
         page_num = self.page_indices[self.current_index]
         self.deleted_pages.add(page_num)
-        self.page_indices.remove(page_num)
+        self.thumbnail_model.remove_row(self.current_index)
 
         if self.current_index >= len(self.page_indices):
             self.current_index = max(0, len(self.page_indices) - 1)
@@ -161,7 +361,18 @@ class PdfImageEditorWindow(QDialog):
             except Exception as e:
                 print(f"Не удалось загрузить состояние: {e}")
 
+    def stop_rendering(self):
+        # Задания держит сам диалог, поэтому перед закрытием дожидаемся уже идущих
+        self.rendering_stopped = True
+        self.render_pool.clear()
+        self.thumbnail_pool.clear()
+        self.render_pool.waitForDone()
+        self.thumbnail_pool.waitForDone()
+        self.pending.clear()
+        self.thumbnail_pending.clear()
+
     def save_and_exit(self):
+        self.stop_rendering()
         self.save_state()
         QMessageBox.information(self, "Сохранено", "Изменения сохранены.")
         if self.back_callback:
@@ -169,6 +380,7 @@ class PdfImageEditorWindow(QDialog):
         self.accept()
 
     def cancel_and_exit(self):
+        self.stop_rendering()
         if self.back_callback:
             self.back_callback()
         self.reject()
@@ -1,20 +1,23 @@
-import os
-import json
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog,
-    QComboBox, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QHeaderView, QAbstractItemView, QProgressBar, QMessageBox
+    QComboBox, QHBoxLayout, QProgressBar, QMessageBox
 )
 from PySide6.QtCore import Qt
-from pdf2image import convert_from_path
-from PIL import Image
 from gui.pdf_image_editor_window import PdfImageEditorWindow
+from gui.job_table import JobTableModel, JobTableView, Column, format_kb, format_kb_int, format_count
+from gui.scanner import FileScanner
+from gui.workers import ConversionWorker, get_thread_pool
+from converter.probe import probe_files
+from converter.common import get_folder_size
+from converter.pdf_to_image import convert_pdf_to_images
 
 class PdfToImageConverterWindow(QWidget):
     def __init__(self, back_callback):
         super().__init__()
         self.back_callback = back_callback
-        self.selected_files = []
+        self.running_jobs = set()
+        self.scanners = set()
+        self.thread_pool = get_thread_pool()
 
         self.setStyleSheet("font-size: 14px;")
         self.resize(1200, 600)
@@ -42,22 +45,19 @@ class PdfToImageConverterWindow(QWidget):
         self.progress_overall.setValue(0)
         layout.addWidget(self.progress_overall)
 
-        self.table = QTableWidget(0, 9)
-        self.table.setHorizontalHeaderLabels([
-            "Файл", "DPI", "Формат", "Входной размер", "Выходной размер",
-            "Редактировать", "Конвертировать", "Удалить", "Статус"
-        ])
-        self.table.setColumnWidth(0, 200)
-        self.table.setColumnWidth(1, 100)
-        self.table.setColumnWidth(2, 100)
-        self.table.setColumnWidth(3, 120)
-        self.table.setColumnWidth(4, 130)
-        self.table.setColumnWidth(5, 100)
-        self.table.setColumnWidth(6, 130)
-        self.table.setColumnWidth(7, 80)
-        self.table.horizontalHeader().setSectionResizeMode(8, QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionMode(QAbstractItemView.NoSelection)
-        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.model = JobTableModel([
+            Column("name", "Файл", width=200),
+            Column("dpi", "DPI", kind="choice", choices=["auto", "72", "96", "150", "300", "600"], width=100),
+            Column("image_format", "Формат", kind="choice", choices=["PNG", "JPEG", "TIFF"], width=100),
+            Column("input_size", "Входной размер", formatter=format_kb, width=120),
+            Column("pages", "Страниц", formatter=format_count, width=80),
+            Column("output_size", "Выходной размер", formatter=format_kb_int, width=130),
+            Column("edit", "Редактировать", kind="button", callback=self.open_editor, width=100),
+            Column("convert", "Конвертировать", kind="button", callback=self.convert_pdf, width=130),
+            Column("delete", "Удалить", kind="button", callback=self.remove_file, width=80),
+            Column("progress", "Статус", kind="progress", stretch=True),
+        ], self)
+        self.table = JobTableView(self.model)
         layout.addWidget(self.table)
 
         button_layout = QHBoxLayout()
@@ -65,6 +65,10 @@ class PdfToImageConverterWindow(QWidget):
         add_button.clicked.connect(self.add_pdfs)
         button_layout.addWidget(add_button)
 
+        add_folder_button = QPushButton("Добавить папку")
+        add_folder_button.clicked.connect(self.add_folder)
+        button_layout.addWidget(add_folder_button)
+
         delete_all_button = QPushButton("Удалить все")
         delete_all_button.clicked.connect(self.clear_all)
         button_layout.addWidget(delete_all_button)
@@ -83,142 +87,107 @@ class PdfToImageConverterWindow(QWidget):
     def add_pdfs(self):
         files, _ = QFileDialog.getOpenFileNames(self, "Выберите PDF файлы",
                                                 "", "PDF файлы (*.pdf)")
-        for file_path in files:
-            if file_path not in self.selected_files and len(self.selected_files) < 50:
-                self.selected_files.append(file_path)
-                self.add_row(file_path)
-
-    def add_row(self, file_path):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        file_name = os.path.basename(file_path)
-        self.table.setItem(row, 0, QTableWidgetItem(file_name))
-
-        dpi_combo = QComboBox()
-        dpi_combo.addItems(["auto", "72", "96", "150", "300", "600"])
-        dpi_combo.setCurrentText("auto")
-        self.table.setCellWidget(row, 1, dpi_combo)
-
-        format_combo = QComboBox()
-        format_combo.addItems(["PNG", "JPEG", "TIFF"])
-        format_combo.setCurrentText(self.global_format_combo.currentText())
-        self.table.setCellWidget(row, 2, format_combo)
-
-        input_size = os.path.getsize(file_path)
-        self.table.setItem(row, 3, QTableWidgetItem(f"{input_size / 1024:.1f} KB"))
-
-        self.table.setItem(row, 4, QTableWidgetItem("—"))
-
-        edit_btn = QPushButton("Редактировать")
-        edit_btn.clicked.connect(lambda _, f=file_path: self.open_editor(f))
-        self.table.setCellWidget(row, 5, edit_btn)
-
-        convert_btn = QPushButton("Конвертировать")
-        convert_btn.clicked.connect(lambda _, r=row: self.convert_pdf(r))
-        self.table.setCellWidget(row, 6, convert_btn)
+        self.start_scan(files)
 
-        delete_btn = QPushButton("Удалить")
-        delete_btn.clicked.connect(lambda _, r=row: self.remove_row(r))
-        self.table.setCellWidget(row, 7, delete_btn)
-
-        progress = QProgressBar()
-        progress.setValue(0)
-        progress.setAlignment(Qt.AlignCenter)
-        self.table.setCellWidget(row, 8, progress)
+    def make_job(self, file_path):
+        return {
+            "dpi": "auto",
+            "image_format": self.global_format_combo.currentText(),
+            "output_size": None
+        }
 
     def open_editor(self, file_path):
         self.editor = PdfImageEditorWindow(file_path, self.show)
         self.hide()
         self.editor.show()
 
-    def clear_all(self):
-        self.table.setRowCount(0)
-        self.selected_files.clear()
-        self.progress_overall.setValue(0)
-
-    def remove_row(self, row):
-        if 0 <= row < len(self.selected_files):
-            self.selected_files.pop(row)
-            self.table.removeRow(row)
-            self.update_progress_bar()
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите папку")
+        if folder:
+            self.start_scan([folder])
 
-    def update_progress_bar(self):
-        total = self.table.rowCount()
-        if total == 0:
-            self.progress_overall.setValue(0)
+    def start_scan(self, paths):
+        if not paths:
             return
-
-        completed = 0
-        for row in range(total):
-            widget = self.table.cellWidget(row, 8)
-            if isinstance(widget, QProgressBar) and widget.value() == 100:
-                completed += 1
-        self.progress_overall.setValue(int((completed / total) * 100))
-
-    def convert_all(self):
-        for row in range(self.table.rowCount()):
-            self.convert_pdf(row)
-
-    def get_folder_size_kb(self, folder):
-        total = 0
-        for dirpath, _, filenames in os.walk(folder):
-            for f in filenames:
-                fp = os.path.join(dirpath, f)
-                if os.path.isfile(fp):
-                    total += os.path.getsize(fp)
-        return total // 1024
-
-    def convert_pdf(self, row):
-        if row >= len(self.selected_files):
+        # Обход папок и чтение размеров идут в фоне, строки добавляются пачками
+        scanner = FileScanner(paths, [".pdf"])
+        scanner.signals.batch.connect(self.on_scan_batch)
+        scanner.signals.finished.connect(lambda _, s=scanner: self.scanners.discard(s))
+        self.scanners.add(scanner)
+        self.thread_pool.start(scanner)
+
+    def on_scan_batch(self, scanner, entries):
+        # Пачка могла встать в очередь до «Удалить все»
+        if scanner.cancelled:
             return
+        self.model.add_files(entries, self.make_job)
+        self.update_progress_bar()
+        self.start_probe([path for path, _ in entries])
 
-        file_path = self.selected_files[row]
-        progress_bar = self.table.cellWidget(row, 8)
-
-        dpi_combo = self.table.cellWidget(row, 1)
-        dpi_value = dpi_combo.currentText()
+    def start_probe(self, paths):
+        # Сведения о файлах читаются из заголовков в фоне, без декодирования
+        worker = ConversionWorker("probe", probe_files, paths)
+        worker.signals.finished.connect(self.on_probe_finished)
+        self.thread_pool.start(worker)
 
-        format_combo = self.table.cellWidget(row, 2)
-        image_format = format_combo.currentText().lower()
+    def on_probe_finished(self, _, results):
+        self.model.update_jobs(results)
 
-        try:
-            progress_bar.setValue(10)
+    def clear_all(self):
+        for scanner in self.scanners:
+            scanner.cancel()
+        self.scanners.clear()
+        self.model.clear()
+        self.progress_overall.setValue(0)
 
-            state_path = os.path.splitext(file_path)[0] + "_state.json"
-            deleted_pages = set()
-            rotation_angles = {}
+    def remove_file(self, file_path):
+        self.model.remove_path(file_path)
+        self.update_progress_bar()
 
-            if os.path.exists(state_path):
-                with open(state_path, "r", encoding="utf-8") as f:
-                    state = json.load(f)
-                    deleted_pages = set(state.get("deleted_pages", []))
-                    rotation_angles = state.get("rotation_angles", {})
+    def update_progress_bar(self):
+        self.progress_overall.setValue(self.model.completed_percent())
 
-            dpi = None if dpi_value == "auto" else int(dpi_value)
-            images = convert_from_path(file_path, dpi=dpi)
+    def convert_all(self):
+        for file_path in self.model.paths():
+            self.convert_pdf(file_path)
 
-            output_folder = os.path.splitext(file_path)[0] + "_images"
-            os.makedirs(output_folder, exist_ok=True)
+    def convert_pdf(self, file_path):
+        job = self.model.job(file_path)
+        if job is None or file_path in self.running_jobs:
+            return
 
-            for i, img in enumerate(images):
-                if i in deleted_pages:
-                    continue
+        dpi_value = job["dpi"]
+        image_format = job["image_format"].lower()
 
-                angle = rotation_angles.get(str(i), 0)
-                if angle != 0:
-                    img = img.rotate(angle, expand=True)
+        try:
+            dpi = None if dpi_value == "auto" else int(dpi_value)
+            worker = ConversionWorker(file_path, convert_pdf_to_images, file_path, image_format, dpi,
+                                      with_progress=True)
 
-                img.save(os.path.join(output_folder, f"page_{i + 1}.{image_format}"), image_format.upper())
+        except Exception as e:
+            self.on_conversion_failed(file_path, str(e))
+            return
 
-            output_size_kb = self.get_folder_size_kb(output_folder)
-            self.table.setItem(row, 4, QTableWidgetItem(f"{output_size_kb} КБ"))
-            progress_bar.setValue(100)
+        self.model.update_job(file_path, progress=10, progress_details=None, error=None)
+        worker.signals.progress.connect(self.on_conversion_progress)
+        worker.signals.finished.connect(self.on_conversion_finished)
+        worker.signals.failed.connect(self.on_conversion_failed)
+        self.running_jobs.add(file_path)
+        self.thread_pool.start(worker)
+
+    def on_conversion_finished(self, file_path, output_path):
+        self.running_jobs.discard(file_path)
+        self.model.update_job(file_path, progress=100, progress_details=None,
+                              output_size=get_folder_size(output_path))
+        self.update_progress_bar()
 
-        except Exception as e:
-            error_label = QLabel("Ошибка: " + str(e))
-            error_label.setStyleSheet("color: red;")
-            self.table.setCellWidget(row, 8, error_label)
-            print(f"Ошибка при конвертации PDF: {e}")
+    def on_conversion_progress(self, file_path, info):
+        self.model.update_job(
+            file_path, progress=max(10, info["percent"]),
+            progress_details=f"стр. {info['page']} из {info['pages']}"
+        )
 
+    def on_conversion_failed(self, file_path, message):
+        self.running_jobs.discard(file_path)
+        self.model.update_job(file_path, error=message, progress_details=None)
         self.update_progress_bar()
@@ -0,0 +1,80 @@
+import os
+import time
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+class ScannerSignals(QObject):
+    # (сканер, пачка): по сканеру окно отбрасывает пачки, которые дошли уже после отмены
+    batch = Signal(object, object)
+    finished = Signal(int)
+
+
+class FileScanner(QRunnable):
+    """
+    Ищет файлы в пуле потоков, чтобы окно не замирало на больших папках и
+    сетевых дисках. Папки обходятся рекурсивно через os.scandir с фильтром по
+    расширениям, явно выбранные файлы берутся как есть. Найденные файлы
+    уходят пачками пар (путь, размер): пачка отправляется, когда набралось
+    BATCH_SIZE файлов или прошло BATCH_INTERVAL секунд.
+    """
+
+    BATCH_SIZE = 1000
+    BATCH_INTERVAL = 0.2
+
+    def __init__(self, paths, extensions):
+        super().__init__()
+        self.paths = list(paths)
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.cancelled = False
+        self.signals = ScannerSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def scan_folder(self, folder):
+        stack = [folder]
+        while stack and not self.cancelled:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.name.lower().endswith(self.extensions):
+                                yield os.path.normpath(entry.path), entry.stat().st_size
+                        except OSError:
+                            continue
+            except OSError as e:
+                print(f"Не удалось прочитать папку {current}: {e}")
+
+    def iter_files(self):
+        for path in self.paths:
+            if self.cancelled:
+                return
+            if os.path.isdir(path):
+                yield from self.scan_folder(path)
+                continue
+            try:
+                yield os.path.normpath(path), os.path.getsize(path)
+            except OSError as e:
+                print(f"Не удалось прочитать файл {path}: {e}")
+
+    def run(self):
+        batch = []
+        total = 0
+        last_sent = time.monotonic()
+        for entry in self.iter_files():
+            if self.cancelled:
+                break
+            batch.append(entry)
+            if len(batch) >= self.BATCH_SIZE or time.monotonic() - last_sent >= self.BATCH_INTERVAL:
+                self.signals.batch.emit(self, batch)
+                total += len(batch)
+                batch = []
+                last_sent = time.monotonic()
+        if batch and not self.cancelled:
+            self.signals.batch.emit(self, batch)
+            total += len(batch)
+        self.signals.finished.emit(total)
@@ -0,0 +1,76 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class WorkerSignals(QObject):
+    progress = Signal(str, object)
+    finished = Signal(str, object)
+    failed = Signal(str, str)
+
+
+class ConversionWorker(QRunnable):
+    """
+    Выполняет функцию конвертации в пуле потоков и сообщает о результате сигналами.
+    key (обычно путь к файлу) позволяет окну найти свою строку, даже если строки
+    таблицы сдвинулись, пока шла конвертация.
+    """
+
+    def __init__(self, key, func, *args, with_progress=False, **kwargs):
+        super().__init__()
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        if with_progress:
+            self.kwargs["progress_callback"] = self.report_progress
+
+    def report_progress(self, value):
+        self.signals.progress.emit(self.key, value)
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"Ошибка при конвертации {self.key}: {e}")
+            self.signals.failed.emit(self.key, str(e))
+        else:
+            self.signals.finished.emit(self.key, result)
+
+
+class BatchWorker(QRunnable):
+    """
+    Выполняет пакетную задачу, которая по мере готовности отдаёт кортежи
+    (ключ, результат, ошибка), и пересылает каждый результат отдельным сигналом.
+    Если пакет прервался целиком, ещё не завершённые ключи получают ошибку.
+    При with_progress задача получает progress_callback(ключ, значение).
+    """
+
+    def __init__(self, keys, func, *args, with_progress=False, **kwargs):
+        super().__init__()
+        self.keys = list(keys)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        if with_progress:
+            self.kwargs["progress_callback"] = self.signals.progress.emit
+
+    def run(self):
+        reported = set()
+        try:
+            for key, result, error in self.func(*self.args, **self.kwargs):
+                reported.add(key)
+                if error is None:
+                    self.signals.finished.emit(key, result)
+                else:
+                    print(f"Ошибка при конвертации {key}: {error}")
+                    self.signals.failed.emit(key, error)
+        except Exception as e:
+            print(f"Ошибка пакетной конвертации: {e}")
+            for key in self.keys:
+                if key not in reported:
+                    self.signals.failed.emit(key, str(e))
+
+
+def get_thread_pool():
+    return QThreadPool.globalInstance()